@@ -0,0 +1,138 @@
+"""
+Vectorized scoring of many candidate schedules at once.
+
+Needs NumPy, which the rest of the scheduler does not.
+"""
+import numpy as np
+
+import scheduler
+
+
+class SectionArrays:
+    """Per-section meeting days, start and end times as NumPy arrays"""
+    def __init__(self, sections, num_days=scheduler.DEFAULT_DAYS_PER_WEEK):
+        self.sections = list(sections)
+        self.num_days = num_days
+        self.meets = np.zeros((len(self.sections), num_days), dtype=bool)
+        self.starts = np.empty(len(self.sections), dtype=np.int64)
+        self.ends = np.empty(len(self.sections), dtype=np.int64)
+
+        for row, section in enumerate(self.sections):
+            for day in section.days:
+                if not 0 <= day < num_days:
+                    raise ValueError(f"Section {section.section_id} of {section.course_id} meets on day {day}, "
+                                     f"outside a {num_days}-day week")
+                self.meets[row, day] = True
+            self.starts[row] = section.start_time
+            self.ends[row] = section.end_time
+
+    @classmethod
+    def from_courses(cls, courses, num_days=scheduler.DEFAULT_DAYS_PER_WEEK):
+        """Build arrays over every section of the courses; returns (arrays, row offset of each course)"""
+        offsets = []
+        sections = []
+        for course in courses:
+            offsets.append(len(sections))
+            sections.extend(course.sections)
+        return cls(sections, num_days), np.array(offsets, dtype=np.int64)
+
+
+def _score_batch(combinations, arrays, preferences):
+    """Return (scores, has_conflict) for an (N, courses) array of section rows"""
+    combinations = np.asarray(combinations, dtype=np.int64)
+    n, width = combinations.shape
+    big = np.iinfo(np.int64).max // 4
+
+    meets = arrays.meets[combinations]  # (N, courses, days)
+    starts = arrays.starts[combinations]
+    ends = arrays.ends[combinations]
+
+    scores = np.zeros(n, dtype=np.int64)
+    has_conflict = np.zeros(n, dtype=bool)
+    pair_slots = np.arange(max(width - 1, 0))
+
+    for day in range(arrays.num_days):
+        on_day = meets[:, :, day]
+        count = on_day.sum(axis=1)
+        has_classes = count > 0
+
+        # Sort each candidate's classes on this day by start time, days off pushed to the end
+        day_starts = np.where(on_day, starts, big)
+        order = np.argsort(day_starts, axis=1, kind='stable')
+        sorted_starts = np.take_along_axis(day_starts, order, axis=1)
+        sorted_ends = np.take_along_axis(np.where(on_day, ends, big), order, axis=1)
+
+        # Gaps between consecutive classes that both meet today
+        real_gap = pair_slots[None, :] < (count - 1)[:, None]
+        gaps = sorted_starts[:, 1:] - sorted_ends[:, :-1]
+
+        # Sorted by start, any overlap shows up between neighbours
+        overlap = (sorted_starts[:, 1:] < sorted_ends[:, :-1]) & (sorted_starts[:, :-1] < sorted_ends[:, 1:])
+        has_conflict |= (real_gap & overlap).any(axis=1)
+
+        # Free day
+        scores += np.where(has_classes, 0, preferences.free_days_weight)
+
+        # Early dismissal and no morning classes
+        last_end = np.where(on_day, ends, -big).max(axis=1)
+        scores += (has_classes & (last_end <= preferences.preferred_latest_time)) * preferences.early_dismissal_weight
+        scores += (has_classes & (sorted_starts[:, 0] >= preferences.preferred_earliest_time)) * preferences.no_morning_weight
+
+        # Breaks between classes
+        good_breaks = real_gap & (gaps >= preferences.minimum_break_time)
+        preferred_breaks = good_breaks & (np.abs(gaps - preferences.preferred_break_time) <= 15)
+        scores += preferred_breaks.sum(axis=1) * preferences.long_breaks_weight
+        scores += ((count > 1) & (good_breaks.sum(axis=1) == count - 1)) * 5
+        scores += (real_gap & (gaps <= 15)).sum(axis=1) * preferences.consecutive_classes_weight
+
+        # Max classes per day
+        scores += (has_classes & (count <= preferences.max_classes_per_day)) * 3
+
+    return np.where(has_conflict, -1000, scores), has_conflict
+
+
+def score_combinations(combinations, arrays, preferences):
+    """
+    Score an (N, courses) integer array of section rows in SectionArrays.
+
+    Each row is one candidate schedule. Returns an array of N scores equal to
+    what Schedule.calculate_score gives for the same sections, as long as
+    arrays.num_days is preferences.days_per_week.
+    """
+    return _score_batch(combinations, arrays, preferences)[0]
+
+
+def exhaustive_batch_scheduler(courses, preferences, batch_size=65536):
+    """
+    Find the optimal schedule by scoring every section combination in vectorized batches.
+
+    Combinations are numbered with the last course varying fastest, and on ties
+    the first one in that order is returned.
+    """
+    arrays, offsets = SectionArrays.from_courses(courses, preferences.days_per_week)
+    radices = np.array([len(course.sections) for course in courses], dtype=np.int64)
+    total = int(np.prod(radices)) if len(courses) else 0
+
+    best_score = float('-inf')
+    best_rows = None
+    for first in range(0, total, batch_size):
+        # Decode combination numbers into one section row per course
+        numbers = np.arange(first, min(first + batch_size, total), dtype=np.int64)
+        combinations = np.empty((len(numbers), len(courses)), dtype=np.int64)
+        for course_idx in range(len(courses) - 1, -1, -1):
+            numbers, digit = np.divmod(numbers, radices[course_idx])
+            combinations[:, course_idx] = offsets[course_idx] + digit
+
+        scores, has_conflict = _score_batch(combinations, arrays, preferences)
+        scores = np.where(has_conflict, np.iinfo(np.int64).min, scores)
+        winner = int(np.argmax(scores))
+        if not has_conflict[winner] and scores[winner] > best_score:
+            best_score = int(scores[winner])
+            best_rows = combinations[winner]
+
+    best_schedule = scheduler.Schedule()
+    best_schedule.score = best_score
+    if best_rows is not None:
+        for row in best_rows:
+            best_schedule.add_section(arrays.sections[row])
+    return best_schedule
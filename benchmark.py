@@ -0,0 +1,199 @@
+"""
+Benchmark the solvers on seeded synthetic catalogs.
+
+    python benchmark.py --courses 4 6 8 --sections 3 5 --seeds 0 1 2 --output bench.json
+
+Every run records wall time, peak memory, nodes expanded, score and the gap to
+the exact optimum, and the results are written as JSON so runs from different
+releases can be compared.
+"""
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+
+import scheduler
+
+
+# Meeting patterns the generator picks from: MWF, TTh, MW, WF, MF, single days
+DEFAULT_PATTERNS = [[0, 2, 4], [1, 3], [0, 2], [2, 4], [0, 4], [0], [1], [2], [3], [4]]
+DURATIONS = [50, 75, 90]
+
+# Extra options per solver; local search gets a fixed seed so runs are reproducible
+SOLVER_OPTIONS = {
+    "local_search": {"seed": 0},
+}
+
+
+def generate_catalog(num_courses, sections_per_course, seed=0, patterns=None, density=0.0,
+                     day_start=8 * 60, day_end=18 * 60, slot=30):
+    """
+    Build a reproducible synthetic catalog.
+
+    Each section gets a random meeting pattern, a duration from DURATIONS and a
+    start time on a `slot`-minute grid. density (0 to 1) squeezes start times
+    towards day_start: 0 spreads them over the whole day, 1 puts every class at
+    day_start, so higher density means more conflicts.
+    """
+    rng = random.Random(seed)
+    patterns = patterns or DEFAULT_PATTERNS
+    courses = []
+    for course_idx in range(num_courses):
+        course_id = f"C{course_idx:03d}"
+        course = scheduler.Course(course_id, f"Course {course_idx}")
+        for section_idx in range(sections_per_course):
+            duration = rng.choice(DURATIONS)
+            window = max(int((day_end - duration - day_start) * (1 - density)), 0)
+            start = day_start + rng.randrange(0, window + 1, slot) if window >= slot else day_start
+            course.add_section(scheduler.Section(str(section_idx + 1), course_id, rng.choice(patterns),
+                                                 start, start + duration, f"Prof {rng.randrange(100)}"))
+        courses.append(course)
+    return courses
+
+
+def generate_preferences(seed=0):
+    """Random but reproducible StudentPreferences"""
+    rng = random.Random(seed)
+    preferences = scheduler.StudentPreferences()
+    preferences.no_morning_weight = rng.randint(1, 10)
+    preferences.free_days_weight = rng.randint(1, 10)
+    preferences.early_dismissal_weight = rng.randint(1, 10)
+    preferences.consecutive_classes_weight = rng.randint(1, 10)
+    preferences.long_breaks_weight = rng.randint(1, 10)
+    preferences.preferred_earliest_time = rng.choice([8, 9, 10, 11]) * 60
+    preferences.preferred_latest_time = rng.choice([14, 15, 16, 17]) * 60
+    preferences.preferred_break_time = rng.choice([15, 30, 45, 60, 75, 90])
+    return preferences
+
+
+def run_solver(name, courses, preferences):
+    """Run one solver twice: once timed, once under tracemalloc for peak memory"""
+    solver = scheduler.SOLVERS[name]
+    options = SOLVER_OPTIONS.get(name, {})
+    stats = scheduler.SearchStats()
+
+    started = time.perf_counter()
+    schedule = solver(courses, preferences, stats=stats, **options)
+    wall_time = time.perf_counter() - started
+
+    tracemalloc.start()
+    solver(courses, preferences, **options)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "solver": name,
+        "wall_time": wall_time,
+        "peak_memory": peak_memory,
+        "nodes": stats.nodes,
+        "score": _json_score(schedule.score),
+        "stats": stats.as_dict(),
+    }
+
+
+def run_benchmarks(course_counts, section_counts, seeds, densities=(0.0,), solvers=tuple(scheduler.SOLVERS)):
+    """Run every solver on every generated configuration and return the result records"""
+    results = []
+    for num_courses in course_counts:
+        for sections_per_course in section_counts:
+            for density in densities:
+                for seed in seeds:
+                    courses = generate_catalog(num_courses, sections_per_course, seed=seed, density=density)
+                    preferences = generate_preferences(seed)
+                    optimum = scheduler.backtracking_scheduler(courses, preferences).score
+
+                    for name in solvers:
+                        record = run_solver(name, courses, preferences)
+                        record.update({
+                            "courses": num_courses,
+                            "sections_per_course": sections_per_course,
+                            "density": density,
+                            "seed": seed,
+                            "optimum": _json_score(optimum),
+                            "gap": _gap(optimum, record["score"]),
+                        })
+                        results.append(record)
+    return results
+
+
+def run_batch_benchmark(num_courses=2000, sections_per_course=10, students=200, courses_per_student=5,
+                        algorithm="greedy", workers=None, seed=0):
+    """
+    Time batch_schedule on a registrar-sized catalog (20k sections by default)
+    with every student picking courses_per_student random courses.
+    """
+    rng = random.Random(seed)
+    courses = generate_catalog(num_courses, sections_per_course, seed=seed)
+    course_ids = [course.course_id for course in courses]
+    requests = [(rng.sample(course_ids, courses_per_student), generate_preferences(seed + student))
+                for student in range(students)]
+
+    started = time.perf_counter()
+    solved = sum(1 for _ in scheduler.batch_schedule(courses, requests, algorithm=algorithm, workers=workers))
+    wall_time = time.perf_counter() - started
+
+    return {
+        "algorithm": algorithm,
+        "catalog_sections": num_courses * sections_per_course,
+        "students": solved,
+        "courses_per_student": courses_per_student,
+        "workers": workers,
+        "wall_time": wall_time,
+        "students_per_second": solved / wall_time if wall_time else None,
+    }
+
+
+def _json_score(score):
+    # JSON has no infinity; an infeasible catalog is recorded as null
+    return None if score in (float('inf'), float('-inf')) else score
+
+
+def _gap(optimum, score):
+    if optimum == float('-inf') or score is None:
+        return None
+    return optimum - score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the schedule solvers on synthetic catalogs.")
+    parser.add_argument("--courses", type=int, nargs="+", default=[4, 6, 8])
+    parser.add_argument("--sections", type=int, nargs="+", default=[3, 5])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.5])
+    parser.add_argument("--solvers", nargs="+", choices=list(scheduler.SOLVERS), default=list(scheduler.SOLVERS))
+    parser.add_argument("--batch-students", type=int, default=0,
+                        help="also time batch_schedule for this many students on a registrar-sized catalog")
+    parser.add_argument("--batch-courses", type=int, default=2000)
+    parser.add_argument("--batch-algorithm", choices=list(scheduler.SOLVERS), default="greedy")
+    parser.add_argument("--batch-workers", type=int, default=None)
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.courses, args.sections, args.seeds, args.densities, args.solvers)
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.batch_students:
+        report["batch"] = run_batch_benchmark(args.batch_courses, students=args.batch_students,
+                                              algorithm=args.batch_algorithm, workers=args.batch_workers)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for record in results:
+        print(f"{record['solver']:>12}  courses={record['courses']:<3} sections={record['sections_per_course']:<3} "
+              f"density={record['density']:<4} seed={record['seed']:<3} time={record['wall_time']:.4f}s "
+              f"peak={record['peak_memory'] / 1024:.0f}KiB nodes={record['nodes']} gap={record['gap']}")
+    if args.batch_students:
+        batch = report["batch"]
+        print(f"batch {batch['algorithm']}: {batch['students']} students on {batch['catalog_sections']} sections "
+              f"in {batch['wall_time']:.2f}s ({batch['students_per_second']:.0f} students/s)")
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
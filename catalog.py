@@ -0,0 +1,224 @@
+"""
+Bulk catalog import: build scheduler.Course/Section objects from CSV or JSON in one pass.
+"""
+import csv
+import itertools
+import json
+import re
+
+import scheduler
+
+
+# Columns (CSV) or keys (JSON) every row needs
+FIELDS = ("course_id", "course_name", "section_id", "days", "start_time", "end_time", "professor")
+
+DAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+DAY_CODES = {"M": 0, "T": 1, "Tu": 1, "W": 2, "Th": 3, "R": 3, "F": 4, "S": 5, "Sa": 5, "Su": 6, "U": 6}
+DAY_CODE_PATTERN = re.compile("Th|Tu|Sa|Su|M|T|W|R|F|S|U")
+TIME_PATTERN = re.compile(r"(\d{1,2}):(\d{2})\s*([AaPp][Mm])?")
+
+
+class RowError:
+    """A row that could not be imported, with the reason"""
+    def __init__(self, row, message):
+        self.row = row  # 1-based data row number (line number for JSON Lines)
+        self.message = message
+
+    def __str__(self):
+        return f"Row {self.row}: {self.message}"
+
+
+class Catalog:
+    """
+    Courses and sections indexed by course_id and (course_id, section_id).
+
+    load_csv and load_json stream rows, parse each distinct time and day string
+    only once, and collect a RowError for every bad row instead of stopping.
+    """
+    def __init__(self):
+        self.courses = []
+        self.course_index = {}   # course_id -> Course
+        self.section_index = {}  # (course_id, section_id) -> Section
+        self.errors = []
+        self._time_cache = {}
+        self._days_cache = {}
+
+    def add_course(self, course_id, course_name):
+        """Add a course; raises ValueError if the course_id is taken"""
+        if course_id in self.course_index:
+            raise ValueError("Course already exists.")
+        course = scheduler.Course(course_id, course_name)
+        self.courses.append(course)
+        self.course_index[course_id] = course
+        return course
+
+    def add_section(self, section):
+        """Add a section to its course; raises ValueError if the course is missing or the section exists"""
+        course = self.course_index.get(section.course_id)
+        if course is None:
+            raise ValueError("Course does not exist.")
+        key = (section.course_id, section.section_id)
+        if key in self.section_index:
+            raise ValueError("Section already exists.")
+        course.add_section(section)
+        self.section_index[key] = section
+        return section
+
+    def course(self, course_id):
+        return self.course_index.get(course_id)
+
+    def section(self, course_id, section_id):
+        return self.section_index.get((course_id, section_id))
+
+    def load_csv(self, source):
+        """Import a CSV file (path or open file) with a header row naming FIELDS; returns sections added"""
+        if isinstance(source, str):
+            with open(source, newline="", encoding="utf-8-sig") as f:
+                return self.load_csv(f)
+
+        reader = csv.DictReader(source)
+        missing = [field for field in FIELDS if field not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+        return self._load_rows(enumerate(reader, start=1))
+
+    def load_json(self, source):
+        """
+        Import JSON (path or open file): either one array of row objects, or
+        JSON Lines with one row object per line, which is read as a stream.
+        Returns the number of sections added.
+        """
+        if isinstance(source, str):
+            with open(source, encoding="utf-8-sig") as f:
+                return self.load_json(f)
+
+        # Decide on the first non-whitespace character, which may follow blank lines
+        leading = []
+        for line in source:
+            leading.append(line)
+            if line.strip():
+                break
+        if leading and leading[-1].lstrip().startswith("["):
+            rows = json.loads("".join(leading) + source.read())
+            return self._load_rows(enumerate(rows, start=1))
+
+        def parsed_rows():
+            for line_number, line in enumerate(itertools.chain(leading, source), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as error:
+                    self.errors.append(RowError(line_number, f"invalid JSON: {error.msg}"))
+
+        return self._load_rows(parsed_rows())
+
+    def _load_rows(self, rows):
+        added = 0
+        for row_number, row in rows:
+            try:
+                self._add_row(row)
+            except (ValueError, TypeError, AttributeError) as error:
+                self.errors.append(RowError(row_number, str(error)))
+            else:
+                added += 1
+        return added
+
+    def _add_row(self, row):
+        if not isinstance(row, dict):
+            raise ValueError("row is not an object")
+        if None in row:
+            raise ValueError("too many columns")  # csv.DictReader puts extra values under None
+        for field in FIELDS:
+            value = row.get(field)
+            if value is None or str(value).strip() == "":
+                raise ValueError(f"missing {field}")
+
+        start_time = self.parse_time(row["start_time"])
+        end_time = self.parse_time(row["end_time"])
+        if end_time <= start_time:
+            raise ValueError("end_time must be after start_time")
+        days = self.parse_days(row["days"])
+
+        course_id = str(row["course_id"]).strip()
+        if course_id not in self.course_index:
+            self.add_course(course_id, str(row["course_name"]).strip())
+        self.add_section(scheduler.Section(str(row["section_id"]).strip(), course_id, days,
+                                           start_time, end_time, str(row["professor"]).strip()))
+
+    def parse_time(self, value):
+        """Parse minutes from midnight, "13:30", or "1:30 PM" (cached per distinct string)"""
+        if isinstance(value, int):
+            return value
+        minutes = self._time_cache.get(value)
+        if minutes is None:
+            minutes = self._time_cache[value] = _parse_time(value)
+        return minutes
+
+    def parse_days(self, value):
+        """Parse "MWF", "TTh", "Mon/Wed", "0,2,4" or a list of day numbers (cached per distinct string)"""
+        if isinstance(value, list):
+            return _check_days(value)
+        days = self._days_cache.get(value)
+        if days is None:
+            days = self._days_cache[value] = _parse_days(value)
+        return list(days)
+
+
+def _parse_time(text):
+    text = str(text).strip()
+    if text.isdigit():
+        return int(text)
+    match = TIME_PATTERN.fullmatch(text)
+    if not match:
+        raise ValueError(f"invalid time {text!r}")
+    hour, minute, am_pm = int(match.group(1)), int(match.group(2)), match.group(3)
+    if am_pm:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"invalid time {text!r}")
+        hour = hour % 12 + (12 if am_pm.upper() == "PM" else 0)
+    if hour > 23 or minute > 59:
+        raise ValueError(f"invalid time {text!r}")
+    return hour * 60 + minute
+
+
+def _parse_days(text):
+    text = str(text).strip()
+    if not text:
+        raise ValueError("missing days")
+    if text[0].isdigit():
+        return _check_days(int(part) for part in re.split(r"[\s,;/]+", text) if part)
+
+    days = []
+    for token in re.split(r"[\s,;/]+", text):
+        if not token:
+            continue
+        lowered = token.lower()
+        full_name = next((i for i, name in enumerate(DAY_NAMES) if lowered in (name, name[:3])), None)
+        if full_name is not None:
+            days.append(full_name)
+            continue
+        codes = DAY_CODE_PATTERN.findall(token)
+        if "".join(codes) != token:
+            raise ValueError(f"invalid days {text!r}")
+        days.extend(DAY_CODES[code] for code in codes)
+    return _check_days(days)
+
+
+def _check_days(days):
+    days = sorted(set(days))
+    if not days:
+        raise ValueError("missing days")
+    if any(not isinstance(day, int) or not 0 <= day < len(DAY_NAMES) for day in days):
+        raise ValueError(f"invalid days {days!r}")
+    return days
+
+
+def load_catalog(path):
+    """Load a .csv, .json or .jsonl file into a new Catalog"""
+    catalog = Catalog()
+    if path.lower().endswith(".csv"):
+        catalog.load_csv(path)
+    else:
+        catalog.load_json(path)
+    return catalog
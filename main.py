@@ -1,7 +1,31 @@
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+import catalog
+import schedule_cache
 import scheduler
 
+# How often the GUI checks on a running solver (about 60 times a second)
+SOLVER_POLL_MS = 16
+
+# Partial schedules "Beam Search" keeps per course
+BEAM_WIDTH = 32
+
+# Days the section form offers and schedules are scored over at least: Monday to Saturday.
+# An imported catalog with Sunday sections widens the week to all seven days.
+DAYS_PER_WEEK = 6
+
+# GUI algorithm names -> scheduler.SOLVERS names; "pareto" computes a scheduler.ParetoFront
+ALGORITHMS = {
+    "Greedy Algorithm": "greedy",
+    "Dynamic Algorithm": "dynamic",
+    "Backtracking Algorithm": "backtracking",
+    "Local Search": "local_search",
+    "Beam Search": "beam",
+    "Pareto Front (live weights)": "pareto",
+}
+
 
 class ScrollableFrame(ttk.Frame):
     def __init__(self, container, *args, **kwargs):
@@ -26,7 +50,14 @@ class PreferencesGUI(tk.Tk):
         super().__init__()
         self.title("Customize Your Preferences")
         self.geometry("500x650")
-        self.courses = []
+        self.catalog = catalog.Catalog()
+        self.schedule_cache = schedule_cache.ScheduleCache(maxsize=256)
+        self.solver_session = scheduler.SchedulerSession()  # Backtracking re-solves start from the last answer
+        self.solver_thread = None
+        self.solver_results = queue.Queue()
+        self.solver_cancel = threading.Event()
+        self.pareto_front = None  # Re-ranked whenever a weight slider moves
+        self.pareto_window = None
         scrollable = ScrollableFrame(self)
         scrollable.pack(fill=tk.BOTH, expand=True)
         self.main_frame = scrollable.scrollable_frame
@@ -36,9 +67,24 @@ class PreferencesGUI(tk.Tk):
         self.init_course_section_inputs()
         ttk.Separator(self.main_frame, orient="horizontal").pack(fill=tk.X, pady=10)
         self.init_preferences_section()
-        ttk.Button(self.main_frame, text="Get Schedule", command=self.save_preferences).pack(pady=20)
+        self.get_schedule_button = ttk.Button(self.main_frame, text="Get Schedule", command=self.save_preferences)
+        self.get_schedule_button.pack(pady=20)
+        self.init_solver_status()
+
+    def init_solver_status(self):
+        frame = ttk.Frame(self.main_frame)
+        frame.pack(fill=tk.X, padx=5, pady=5)
+
+        self.solver_progress = ttk.Progressbar(frame, mode="indeterminate")
+        self.solver_progress.pack(fill=tk.X, pady=2)
+
+        self.solver_status = tk.StringVar(value="")
+        ttk.Label(frame, textvariable=self.solver_status).pack(side=tk.LEFT)
+
+        self.cancel_button = ttk.Button(frame, text="Cancel", command=self.cancel_solver, state="disabled")
+        self.cancel_button.pack(side=tk.RIGHT)
     
-    def show_schedule_window(self, schedule_text, title="Your Schedule"):
+    def show_schedule_window(self, schedule_text, title="Your Schedule", modal=True):
         # Create a new top-level window
         schedule_window = tk.Toplevel(self)
         schedule_window.title(title)
@@ -72,6 +118,7 @@ class PreferencesGUI(tk.Tk):
         # Insert the schedule text
         text_widget.insert(tk.END, schedule_text)
         text_widget.config(state=tk.DISABLED)  # Make it read-only
+        schedule_window.text_widget = text_widget
         
         # Add a close button
         close_button = ttk.Button(
@@ -84,9 +131,10 @@ class PreferencesGUI(tk.Tk):
         # Focus the new window
         schedule_window.focus_set()
         
-        # Optional: Make window modal
+        # Modal unless the main window's sliders must stay usable
         schedule_window.transient(self)
-        schedule_window.grab_set()
+        if modal:
+            schedule_window.grab_set()
         
         return schedule_window
 
@@ -134,6 +182,8 @@ class PreferencesGUI(tk.Tk):
         self.prefs['prefer_early_dismissal'] = add_pref_row(6, "Prefer Early Dismissal:", 6)
         self.prefs['prefer_consecutive_classes'] = add_pref_row(7, "Prefer Consecutive Classes:", 3)
         self.prefs['prefer_long_breaks'] = add_pref_row(8, "Prefer Long Breaks:", 7)
+        for var, slider_val in self.prefs.values():
+            slider_val.trace_add("write", lambda *args: self.rerank_front())
 
         # Breaks and Algorithm
         ttk.Label(frame, text="Preferred Break Time (minutes):").grid(row=9, column=0, sticky="w", pady=10)
@@ -142,7 +192,7 @@ class PreferencesGUI(tk.Tk):
 
         ttk.Label(frame, text="Scheduling Algorithm:").grid(row=11, column=0, sticky="w", pady=10)
         self.scheduling_algo = tk.StringVar(value="Choose Algorithm")
-        ttk.Combobox(frame, values=["Greedy Algorithm", "Dynamic Algorithm", "Backtracking Algorithm"],
+        ttk.Combobox(frame, values=list(ALGORITHMS),
                      textvariable=self.scheduling_algo, state="readonly").grid(row=11, column=1, padx=5)
 
     def init_course_section_inputs(self):
@@ -182,7 +232,7 @@ class PreferencesGUI(tk.Tk):
         # Days
         ttk.Label(section_frame, text="Days:").grid(row=9, column=0, sticky="nw")
         self.days_vars = {}
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+        days = scheduler.DAY_NAMES[:DAYS_PER_WEEK]
         days_frame = ttk.Frame(section_frame)
         days_frame.grid(row=9, column=1, sticky="w")
         for i, day in enumerate(days):
@@ -192,23 +242,14 @@ class PreferencesGUI(tk.Tk):
             self.days_vars[day] = var
 
         ttk.Button(section_frame, text="Add Section", command=self.add_section).grid(row=10, column=0, columnspan=2, pady=10)
+        ttk.Button(section_frame, text="Import Catalog...", command=self.import_catalog).grid(row=11, column=0, columnspan=2, pady=5)
 
     def validate_inputs(self):
-        required_fields = [
-            self.course_code.get(),
-            self.course_name.get(),
-            self.section_id.get(),
-            self.section_course_id.get(),
-            self.professor.get(),
-            self.section_start.get(),
-            self.section_end.get(),
-            self.scheduling_algo.get()
-        ]
-        if any(not field.strip() or field == "Choose Algorithm" for field in required_fields):
-            messagebox.showerror("Missing Fields", "Please fill in all required fields and select an algorithm.")
+        if self.scheduling_algo.get() == "Choose Algorithm":
+            messagebox.showerror("Missing Fields", "Please select an algorithm.")
             return False
-        if not any(var.get() for var in self.days_vars.values()):
-            messagebox.showerror("Missing Days", "Please select at least one day.")
+        if not self.catalog.section_index:
+            messagebox.showerror("Missing Sections", "Please add or import at least one course section.")
             return False
         return True
     
@@ -218,101 +259,266 @@ class PreferencesGUI(tk.Tk):
         if not course_code or not course_name:
             print("Please fill in all fields.")
             return
-        course = scheduler.Course(course_code, course_name)
 
-        #check if course already exists
-        for c in self.courses:
-            if c.course_id == course_code:
-                print("Course already exists.")
-                return
-        self.courses.append(course)
-
-        #print courses
-        print("Courses:")
-        for c in self.courses:
-            print(f"Course ID: {c.course_id}, Course Name: {c.course_name}")
+        try:
+            self.catalog.add_course(course_code, course_name)
+        except ValueError as error:
+            print(error)
+            return
+        print(f"Added course {course_code} ({len(self.catalog.courses)} courses)")
 
     def add_section(self):
         section_id = self.section_id.get()
         section_course_id = self.section_course_id.get()
 
         #get days and encode them: Monday = 0, Tuesday = 1, Wednesday = 2, Thursday = 3, Friday = 4, Saturday = 5
-        d = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
         days = [day for day, var in self.days_vars.items() if var.get()]
-        days = [d.index(day) for day in days]
-        
-        start_time = self.section_start.get()
-        start_hour = int(start_time.split(':')[0])
-        start_minute = int(start_time.split(':')[1])
-        end_time = self.section_end.get()
-        end_hour = int(end_time.split(':')[0])
-        end_minute = int(end_time.split(':')[1])
+        days = [scheduler.DAY_NAMES.index(day) for day in days]
         professor = self.professor.get()
 
-        if not section_id or not section_course_id or not professor or not start_time or not end_time or not days:
+        if not section_id or not section_course_id or not professor or not days:
             print("Please fill in all fields.")
             return
-        
-        # Check if course exists
-        course = next((c for c in self.courses if c.course_id == section_course_id), None)
-        if not course:
-            print("Course does not exist.")
+        try:
+            start_time = self.catalog.parse_time(self.section_start.get())
+            end_time = self.catalog.parse_time(self.section_end.get())
+        except ValueError as error:
+            print(error)
+            return
+
+        # Create section; the catalog checks the course exists and the section is new
+        section = scheduler.Section(section_id, section_course_id, days, start_time, end_time, professor)
+        try:
+            self.catalog.add_section(section)
+        except ValueError as error:
+            print(error)
             return
-        # Check if section already exists
-        for c in self.courses:
-            if c.course_id == section_course_id:
-                for s in c.sections:
-                    if s.section_id == section_id:
-                        print("Section already exists.")
-                        return
-        # Create section
-        #phys101.add_section(Section("3", "PHYS101", [2, 4], 13*60, 14*60+30, "Jackson"))
-        section = scheduler.Section(section_id, section_course_id, days, start_hour*60+start_minute, end_hour*60+end_minute, professor)
-        course.add_section(section)
         print(f"Added section {section_id} to course {section_course_id}")
-        # Print sections
-        print("Sections:")
-        for c in self.courses:
-            print(f"Course ID: {c.course_id}, Course Name: {c.course_name}")
-            for s in c.sections:
-                print(type(s))
+
+    def import_catalog(self):
+        path = filedialog.askopenfilename(
+            title="Import Catalog",
+            filetypes=[("Catalog files", "*.csv *.json *.jsonl"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+
+        errors_before = len(self.catalog.errors)
+        try:
+            if path.lower().endswith(".csv"):
+                added = self.catalog.load_csv(path)
+            else:
+                added = self.catalog.load_json(path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Import Failed", str(error))
+            return
+
+        errors = self.catalog.errors[errors_before:]
+        message = f"Imported {added} sections ({len(self.catalog.courses)} courses in catalog)."
+        if errors:
+            message += f"\n\n{len(errors)} rows skipped:\n" + "\n".join(str(error) for error in errors[:10])
+            if len(errors) > 10:
+                message += f"\n... and {len(errors) - 10} more"
+        messagebox.showinfo("Import Catalog", message)
         
+    def build_preferences(self):
+        """StudentPreferences from the current state of the preference widgets"""
+        start_hour = int(self.start_time.get().split(':')[0])
+        end_hour = int(self.end_time.get().split(':')[0])
+
+        p = {k: slider.get() for k, (var, slider) in self.prefs.items()}
+        preferences = scheduler.StudentPreferences()
+        preferences.no_morning_weight = p.get('avoid_morning_classes')      # Strong preference for no morning classes
+        preferences.free_days_weight = p.get('prefer_free_days')         # Strong preference for free days
+        preferences.early_dismissal_weight = p.get('prefer_early_dismissal')   # Moderate preference for early dismissal
+        preferences.consecutive_classes_weight = p.get('prefer_consecutive_classes')  # Low preference for consecutive classes
+        preferences.long_breaks_weight = p.get('prefer_long_breaks')       # High preference for long breaks
+
+        preferences.preferred_earliest_time = start_hour * 60  # No classes before 10 AM
+        preferences.preferred_latest_time = end_hour * 60    # No classes after 5 PM
+        preferences.preferred_break_time = int(self.pref_break_time.get())
+        preferences.days_per_week = self.days_per_week()
+        return preferences
+
+    def days_per_week(self):
+        """DAYS_PER_WEEK, or more if the catalog has sections on later days"""
+        last_day = max((day for section in self.catalog.section_index.values() for day in section.days), default=0)
+        return min(max(DAYS_PER_WEEK, last_day + 1), len(scheduler.DAY_NAMES))
+
     def save_preferences(self):
         if not self.validate_inputs():
             return
 
         if messagebox.askyesno("Confirm", "Are you sure you want to proceed?"):
-            start_hour = int(self.start_time.get().split(':')[0])
-            end_hour = int(self.end_time.get().split(':')[0])
-
-            p = {k: slider.get() for k, (var, slider) in self.prefs.items()}
-            preferences = scheduler.StudentPreferences()
-            preferences.no_morning_weight = p.get('avoid_morning_classes')      # Strong preference for no morning classes
-            preferences.free_days_weight = p.get('prefer_free_days')         # Strong preference for free days
-            preferences.early_dismissal_weight = p.get('prefer_early_dismissal')   # Moderate preference for early dismissal
-            preferences.consecutive_classes_weight = p.get('prefer_consecutive_classes')  # Low preference for consecutive classes
-            preferences.long_breaks_weight = p.get('prefer_long_breaks')       # High preference for long breaks
-            
-            preferences.preferred_earliest_time = start_hour * 60  # No classes before 10 AM
-            preferences.preferred_latest_time = end_hour * 60    # No classes after 5 PM
-            preferences.preferred_break_time = int(self.pref_break_time.get())
+            preferences = self.build_preferences()
 
             algo = self.scheduling_algo.get()
+            if algo not in ALGORITHMS:
+                print("Please select a scheduling algorithm.")
+                return
+
+            self.start_solver(algo, preferences)
+        else:
+            messagebox.showinfo("Cancelled", "You cancelled saving your preferences.")
+
+    def start_solver(self, algo, preferences):
+        """Run the solver on a background thread and poll it from the Tk main loop"""
+        if self.solver_thread is not None:
+            return
+
+        # Solve a snapshot so sections added while solving don't change the catalog under the search
+        courses = []
+        for course in self.catalog.courses:
+            snapshot = scheduler.Course(course.course_id, course.course_name)
+            snapshot.sections = list(course.sections)
+            courses.append(snapshot)
+
+        self.solver_algo = algo
+        self.solver_days = preferences.days_per_week
+        self.solver_results = queue.Queue()
+        self.solver_cancel = threading.Event()
+        self.solver_thread = threading.Thread(
+            target=self.run_solver,
+            args=(self.schedule_cache, self.solver_session, algo, courses, preferences, self.solver_cancel,
+                  self.solver_results),
+            daemon=True
+        )
+
+        self.get_schedule_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.solver_status.set(f"Solving with {algo}...")
+        self.solver_progress.start(SOLVER_POLL_MS)
+
+        self.solver_thread.start()
+        self.after(SOLVER_POLL_MS, self.poll_solver)
+
+    @staticmethod
+    def run_solver(cache, session, algo, courses, preferences, cancel, results):
+        """Solver thread body; everything it reports goes through the results queue"""
+        def report_progress(best_score, nodes):
+            results.put(("progress", (best_score, nodes)))
+
+        # Repeated requests (e.g. clicking "Get Schedule" again) are answered from the cache
+        try:
+            # Courses that can't all fit are reported straight away instead of after a full search
+            core = scheduler.conflicting_core(courses, cancel=cancel)
+            if core:
+                partial = scheduler.max_coverage_scheduler(courses, preferences, progress=report_progress,
+                                                           progress_interval=2000, cancel=cancel)
+                covered = {section.course_id for section in partial.assigned_sections}
+                dropped = [course for course in courses if course.course_id not in covered]
+                results.put(("cancelled", None) if cancel.is_set() else ("infeasible", (core, dropped, partial)))
+                return
 
             if algo == "Greedy Algorithm":
-                sched = scheduler.greedy_schedule_optimizer(self.courses, preferences)
+                sched = cache.solve(courses, preferences, "greedy")
             elif algo == "Dynamic Algorithm":
-                sched = scheduler.dynamic_programming_scheduler(self.courses, preferences)
-            elif algo == "Backtracking Algorithm":
-                sched = scheduler.backtracking_scheduler(self.courses, preferences)
+                sched = cache.solve(courses, preferences, "dynamic", cancel=cancel)
+            elif algo == "Pareto Front (live weights)":
+                # Not cached: the front is kept by the GUI and re-ranked as the sliders move
+                sched = scheduler.pareto_front(courses, preferences, cancel=cancel)
+            elif algo == "Beam Search":
+                sched = cache.solve(courses, preferences, "beam", beam_width=BEAM_WIDTH)
+            elif algo == "Local Search":
+                # Fixed seed and iteration budget, so the same request gets the same (cacheable) answer
+                sched = cache.solve(courses, preferences, "local_search", seed=0, progress=report_progress,
+                                    progress_interval=2000, cancel=cancel)
             else:
-                print("Please select a scheduling algorithm.")
-                return
-            
-            schedule_string = sched.get_sched()
-            self.show_schedule_window(schedule_string, f"Your Optimized Schedule - {algo}")
+                # Misses go through the session, so a small edit re-solves from the previous answer
+                sched = cache.solve(courses, preferences, "backtracking", solver=session.solve,
+                                    progress=report_progress, progress_interval=2000, cancel=cancel)
+        except scheduler.SearchCancelled:
+            results.put(("cancelled", None))
+        except Exception as error:
+            results.put(("error", error))
         else:
-            messagebox.showinfo("Cancelled", "You cancelled saving your preferences.")
+            results.put(("cancelled", None) if cancel.is_set() else ("done", sched))
+
+    def poll_solver(self):
+        """Drain the solver's queue, update the progress display and reschedule until it finishes"""
+        outcome = None
+        latest_progress = None
+        while True:
+            try:
+                kind, payload = self.solver_results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                latest_progress = payload
+            else:
+                outcome = (kind, payload)
+
+        if latest_progress is not None:
+            best_score, nodes = latest_progress
+            best_text = "none yet" if best_score == float('-inf') else best_score
+            self.solver_status.set(f"Nodes explored: {nodes:,}  Best score so far: {best_text}")
+
+        if outcome is None:
+            self.after(SOLVER_POLL_MS, self.poll_solver)
+            return
+
+        self.finish_solver()
+        kind, payload = outcome
+        if kind == "done" and isinstance(payload, scheduler.ParetoFront):
+            self.solver_status.set(f"{len(payload)} trade-off schedules found; move the sliders to re-rank them.")
+            self.show_front(payload)
+        elif kind == "done":
+            self.solver_status.set("")
+            self.show_schedule_window(payload.get_sched(self.solver_days), f"Your Optimized Schedule - {self.solver_algo}")
+        elif kind == "infeasible":
+            self.solver_status.set("")
+            self.show_schedule_window(self.describe_infeasible(*payload, self.solver_days), "No Conflict-Free Schedule")
+        elif kind == "cancelled":
+            self.solver_status.set("Cancelled.")
+        else:
+            self.solver_status.set("")
+            messagebox.showerror("Scheduling Failed", str(payload))
+
+    @staticmethod
+    def describe_infeasible(core, dropped, partial, days_per_week):
+        """Explain which courses clash and show the best schedule of the rest"""
+        lines = ["These courses can't all be taken together:"]
+        lines += [f"  {course.course_id} - {course.course_name}" for course in core]
+        lines.append("Dropping any one of them removes this conflict.")
+        lines.append("")
+        lines.append(f"Best schedule without {', '.join(course.course_id for course in dropped)}:")
+        lines.append("")
+        return "\n".join(lines) + "\n" + partial.get_sched(days_per_week)
+
+    def show_front(self, front):
+        self.pareto_front = front
+        if self.pareto_window is not None and self.pareto_window.winfo_exists():
+            self.pareto_window.destroy()
+        self.pareto_window = self.show_schedule_window("", f"Your Optimized Schedule - {self.solver_algo}", modal=False)
+        self.rerank_front()
+
+    def rerank_front(self):
+        """Show the front's best schedule for the current slider weights, without solving again"""
+        if self.pareto_front is None or not self.pareto_window.winfo_exists():
+            return
+        preferences = self.build_preferences()
+        try:
+            schedule = self.pareto_front.best(preferences)
+        except ValueError:
+            self.solver_status.set("Times, break length or days changed; press Get Schedule to recompute the front.")
+            return
+        text_widget = self.pareto_window.text_widget
+        text_widget.config(state=tk.NORMAL)
+        text_widget.delete("1.0", tk.END)
+        text_widget.insert(tk.END, schedule.get_sched(preferences.days_per_week))
+        text_widget.config(state=tk.DISABLED)
+
+    def cancel_solver(self):
+        if self.solver_thread is not None:
+            self.solver_cancel.set()
+            self.cancel_button.config(state="disabled")
+            self.solver_status.set("Cancelling...")
+
+    def finish_solver(self):
+        self.solver_thread = None
+        self.solver_progress.stop()
+        self.get_schedule_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
 
 if __name__ == "__main__":
     app = PreferencesGUI()
@@ -0,0 +1,126 @@
+"""
+Memoization in front of the solvers: identical requests are answered without re-solving.
+"""
+import hashlib
+import shelve
+import threading
+from collections import OrderedDict
+
+import scheduler
+
+
+# Part of every key; bump it when the packed result format changes so old on-disk entries are ignored
+CACHE_FORMAT = 2
+
+# Solver options that don't change the answer, so they stay out of the cache key
+IGNORED_OPTIONS = {"conflict_index", "stats", "progress", "progress_interval", "cancel", "workers",
+                   "split_depth", "memo_limit"}
+
+
+class ScheduleCache:
+    """
+    LRU cache of solver results keyed by catalog fingerprint, preferences and algorithm.
+
+    The key is a SHA-256 of every selected course's id and section days and
+    times (in order), every StudentPreferences field, the algorithm and the solver options
+    that affect the result. Results are stored as section positions, so a hit is
+    rebuilt against the caller's own Section objects. With a path, entries are
+    also written to a shelve file and survive restarts; the in-memory LRU holds
+    at most maxsize entries. Safe to share between threads.
+    """
+    def __init__(self, maxsize=1024, path=None):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.store = shelve.open(path) if path else None
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0  # Hits that came from the on-disk store (also counted in hits)
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, courses, preferences, algorithm, solver_options):
+        """Return the stable cache key of a request"""
+        # Course ids are part of the key because course priorities (max_coverage) are keyed by them
+        catalog = tuple(
+            (course.course_id,
+             tuple((tuple(section.days), section.start_time, section.end_time) for section in course.sections))
+            for course in courses
+        )
+        prefs = tuple(sorted(vars(preferences).items()))
+        options = tuple(sorted((name, value) for name, value in solver_options.items()
+                               if name not in IGNORED_OPTIONS))
+        return hashlib.sha256(repr((CACHE_FORMAT, algorithm, options, prefs, catalog)).encode()).hexdigest()
+
+    def solve(self, courses, preferences, algorithm="backtracking", solver=None, **solver_options):
+        """
+        Return the cached result of a request, or solve it with scheduler.SOLVERS[algorithm]
+        and store it. solver can stand in for the SOLVERS entry on a miss (e.g. a
+        SchedulerSession's solve); it must give the same answers.
+        """
+        key = self.key(courses, preferences, algorithm, solver_options)
+        packed = self.get(key)
+        if packed is not None:
+            return scheduler.unpack_result(packed, courses)
+
+        result = (solver or scheduler.SOLVERS[algorithm])(courses, preferences, **solver_options)
+
+        # Runs stopped early by a budget or a cancel aren't the real answer to the request
+        cancel = solver_options.get("cancel")
+        schedules = result if isinstance(result, list) else [result]
+        finished = all(not schedule.optimality_gap for schedule in schedules)
+        if finished and not (cancel is not None and cancel.is_set()):
+            self.put(key, scheduler.pack_result(result, scheduler.section_positions(courses)))
+        return result
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            if self.store is not None and key in self.store:
+                packed = self.store[key]
+                self._remember(key, packed)
+                self.hits += 1
+                self.disk_hits += 1
+                return packed
+            self.misses += 1
+            return None
+
+    def put(self, key, packed):
+        with self.lock:
+            self._remember(key, packed)
+            if self.store is not None:
+                self.store[key] = packed
+
+    def _remember(self, key, packed):
+        self.entries[key] = packed
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """Return the hit/miss/eviction counters"""
+        with self.lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "evictions": self.evictions, "size": len(self.entries)}
+
+    def clear(self):
+        """Drop every entry, in memory and on disk"""
+        with self.lock:
+            self.entries.clear()
+            if self.store is not None:
+                self.store.clear()
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,161 @@
+"""
+Export solved schedules as JSON, CSV or iCalendar.
+
+Every exporter takes an iterable of schedules and writes to an open text file
+one schedule at a time, so the output of batch_schedule can be streamed to disk
+without holding every result in memory. Items can be Schedule objects or
+(student, Schedule) pairs, e.g. straight from batch_schedule. A pair can also
+hold a ranked list of schedules, as batch_schedule gives with k set; each one is
+written as its own record with its 1-based rank (rank is empty otherwise). Open
+files for the CSV and iCalendar exporters with newline="" so their line endings
+are kept.
+"""
+import csv
+import datetime
+import json
+
+import scheduler
+
+
+CSV_FIELDS = ("student", "rank", "score", "course_id", "section_id", "professor", "days", "start_time", "end_time")
+
+# iCalendar BYDAY codes, indexed like scheduler.DAY_NAMES
+ICAL_DAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+def _entries(schedules):
+    """Yield (student, rank, schedule); bare schedules are numbered from 0, ranked lists are flattened"""
+    for number, item in enumerate(schedules):
+        if isinstance(item, scheduler.Schedule):
+            yield number, None, item
+            continue
+        student, result = item
+        if isinstance(result, scheduler.Schedule):
+            yield student, None, result
+        else:
+            for rank, schedule in enumerate(result, start=1):
+                yield student, rank, schedule
+
+
+def _score(value):
+    # JSON has no infinities; "no schedule" (score -inf) is written as null, or empty in CSV
+    return None if value in (float('inf'), float('-inf')) else value
+
+
+def _clock(minutes):
+    hour, minute = divmod(minutes, 60)
+    return f"{hour:02d}:{minute:02d}"
+
+
+def schedule_record(schedule, student=None, rank=None):
+    """Return a schedule as a JSON-ready dict"""
+    return {
+        "student": student,
+        "rank": rank,
+        "score": _score(schedule.score),
+        "optimality_gap": _score(schedule.optimality_gap),
+        "sections": [
+            {
+                "course_id": section.course_id,
+                "section_id": section.section_id,
+                "professor": section.professor,
+                "days": [scheduler.DAY_NAMES[day] for day in section.days],
+                "start_time": _clock(section.start_time),
+                "end_time": _clock(section.end_time),
+                "alternatives": [{"section_id": other.section_id, "professor": other.professor}
+                                 for other in schedule.alternatives.get(section, ())[1:]],
+            }
+            for section in schedule.assigned_sections
+        ],
+    }
+
+
+def write_json(schedules, out):
+    """Write a JSON array with one object per schedule; returns how many were written"""
+    count = 0
+    out.write("[")
+    for student, rank, schedule in _entries(schedules):
+        out.write(",\n" if count else "\n")
+        out.write(json.dumps(schedule_record(schedule, student, rank)))
+        count += 1
+    out.write("\n]\n" if count else "]\n")
+    return count
+
+
+def write_csv(schedules, out):
+    """Write one CSV row per scheduled section, with a header; returns how many schedules were written"""
+    writer = csv.writer(out)
+    writer.writerow(CSV_FIELDS)
+    count = 0
+    for student, rank, schedule in _entries(schedules):
+        score = _score(schedule.score)
+        for section in schedule.assigned_sections:
+            writer.writerow((student, rank, score, section.course_id, section.section_id, section.professor,
+                             " ".join(scheduler.DAY_NAMES[day][:3] for day in section.days),
+                             _clock(section.start_time), _clock(section.end_time)))
+        count += 1
+    return count
+
+
+def write_ical(schedules, out, term_start, term_end, stamp=None):
+    """
+    Write an iCalendar file with one weekly recurring event per scheduled section.
+
+    Each event starts on the section's first meeting on or after term_start
+    (a datetime.date) and repeats on its days until term_end. Times are floating
+    local times. stamp is the DTSTAMP (a UTC datetime), now by default. Returns
+    how many schedules were written.
+    """
+    if term_end < term_start:
+        raise ValueError("term_end is before term_start")
+    stamp = (stamp or datetime.datetime.now(datetime.timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    until = term_end.strftime("%Y%m%dT235959")
+
+    _write_lines(out, ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Course Scheduler//Schedule Export//EN",
+                       "CALSCALE:GREGORIAN"])
+    count = 0
+    for student, rank, schedule in _entries(schedules):
+        uid_prefix = student if rank is None else f"{student}-{rank}"
+        for section in schedule.assigned_sections:
+            if not section.days:
+                continue
+            offset = min((day - term_start.weekday()) % 7 for day in section.days)
+            first_day = term_start + datetime.timedelta(days=offset)
+            if first_day > term_end:
+                continue
+
+            summary = f"{section.course_id} (Section {section.section_id})"
+            _write_lines(out, [
+                "BEGIN:VEVENT",
+                f"UID:{_escape(f'{uid_prefix}-{section.course_id}-{section.section_id}')}@course-scheduler",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{first_day.strftime('%Y%m%d')}T{_clock(section.start_time).replace(':', '')}00",
+                f"DTEND:{first_day.strftime('%Y%m%d')}T{_clock(section.end_time).replace(':', '')}00",
+                f"RRULE:FREQ=WEEKLY;UNTIL={until};BYDAY={','.join(ICAL_DAYS[day] for day in section.days)}",
+                f"SUMMARY:{_escape(summary)}",
+                f"DESCRIPTION:{_escape(f'Professor: {section.professor}')}",
+                "END:VEVENT",
+            ])
+        count += 1
+    _write_lines(out, ["END:VCALENDAR"])
+    return count
+
+
+def _escape(text):
+    return (str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _write_lines(out, lines):
+    # Content lines end in CRLF and are folded at 75 octets; continuation lines start with a space
+    for line in lines:
+        encoded = line.encode("utf-8")
+        limit = 75
+        while len(encoded) > limit:
+            cut = limit
+            while encoded[cut] & 0xC0 == 0x80:  # Don't split a multi-byte character
+                cut -= 1
+            out.write(encoded[:cut].decode("utf-8") + "\r\n ")
+            encoded = encoded[cut:]
+            limit = 74
+        out.write(encoded.decode("utf-8") + "\r\n")
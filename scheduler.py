@@ -1,4 +1,29 @@
+import cProfile
+import functools
+import heapq
+import io
+import math
+import multiprocessing
+import operator
+import pstats
+import random
+import sys
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+# Day numbers index DAY_NAMES; a week is its first days_per_week days
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAY_CODES = ["M", "T", "W", "Th", "F", "Sa", "Su"]  # Short forms used by Section.__str__
+DEFAULT_DAYS_PER_WEEK = 5
+
+
 class Course:
+    __slots__ = ('course_id', 'course_name', 'sections')
+
     def __init__(self, course_id, course_name):
         self.course_id = course_id
         self.course_name = course_name
@@ -12,20 +37,46 @@ class Course:
 
 
 class Section:
+    """
+    One meeting pattern of a course.
+
+    Besides the raw days and times, each section keeps a day bitmask (bit d set
+    if it meets on day d), recomputed whenever days are assigned, so overlap
+    tests and day lookups start from a single AND.
+    """
+    __slots__ = ('section_id', 'course_id', 'professor', '_days', 'day_mask', 'start_time', 'end_time')
+
     def __init__(self, section_id, course_id, days, start_time, end_time, professor):
         self.section_id = section_id
         self.course_id = course_id
-        self.days = days  # List of days: 0=Monday, 1=Tuesday, etc.
+        self.days = days  # Days: 0=Monday, 1=Tuesday, etc.
         self.start_time = start_time  # In minutes from midnight (e.g., 9:00 AM = 540)
         self.end_time = end_time      # In minutes from midnight
         self.professor = professor
+
+    @property
+    def days(self):
+        return self._days
+
+    @days.setter
+    def days(self, days):
+        self._days = tuple(days)
+        day_mask = 0
+        for day in self._days:
+            day_mask |= 1 << day
+        self.day_mask = day_mask
+
+    def meets_on(self, day):
+        """Check if the section meets on a day"""
+        return (self.day_mask >> day) & 1 == 1
+
+    def overlaps(self, other):
+        """Check if two sections meet on a common day at overlapping times"""
+        return (self.day_mask & other.day_mask != 0
+                and not (self.end_time <= other.start_time or self.start_time >= other.end_time))
     
     def __str__(self):
-        days_str = ''.join(['M' if 0 in self.days else '', 
-                          'T' if 1 in self.days else '',
-                          'W' if 2 in self.days else '',
-                          'Th' if 3 in self.days else '',
-                          'F' if 4 in self.days else ''])
+        days_str = ''.join(code for day, code in enumerate(DAY_CODES) if self.meets_on(day))
         start_hour, start_min = divmod(self.start_time, 60)
         end_hour, end_min = divmod(self.end_time, 60)
         start_time_str = f"{start_hour}:{start_min:02d}"
@@ -34,6 +85,188 @@ class Section:
         return f"Section {self.section_id} ({days_str} {start_time_str}-{end_time_str}, Prof. {self.professor})"
 
 
+def sections_overlap(sec1, sec2):
+    """Check if two sections meet on a common day at overlapping times"""
+    return sec1.overlaps(sec2)
+
+
+def bit_positions(mask):
+    """Yield the positions of the set bits of a mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_from_positions(positions):
+    """Return the mask with the given bit positions set, built in one pass"""
+    if not positions:
+        return 0
+    bits = bytearray((max(positions) >> 3) + 1)
+    for pos in positions:
+        bits[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _prefix_masks(positions, keys):
+    """
+    Map k to the mask of positions[:k], for every k where keys (sorted, one per
+    position) changes value, plus 0 and len(positions).
+    """
+    masks = {0: 0}
+    mask = 0
+    for count, pos in enumerate(positions, 1):
+        mask |= 1 << pos
+        if count == len(positions) or keys[count] != keys[count - 1]:
+            masks[count] = mask
+    return masks
+
+
+class ConflictIndex:
+    """
+    Pairwise conflict bitsets over every section of a catalog.
+
+    Each section gets a bit position, and conflict_masks[i] has bit j set when
+    sections i and j overlap. The index is built once per catalog; after that,
+    checking a section against a whole partial schedule is a single bitwise AND
+    with the schedule's occupied mask.
+    """
+    def __init__(self, courses):
+        self.sections = []      # Bit position -> section
+        self.positions = {}     # id(section) -> bit position
+        self.course_masks = []  # Bits of each course's sections, in course order
+
+        for course in courses:
+            course_mask = 0
+            for section in course.sections:
+                if id(section) not in self.positions:
+                    self.positions[id(section)] = len(self.sections)
+                    self.sections.append(section)
+                course_mask |= 1 << self.positions[id(section)]
+            self.course_masks.append(course_mask)
+
+        # Sections meeting on a day conflict with a section when they start before it
+        # ends and don't end by the time it starts. Per day, prefix masks over the
+        # sections sorted by start and by end answer both halves with one AND, so
+        # the build takes a few catalog-wide integer operations per section instead
+        # of one per conflicting pair.
+        day_buckets = {}
+        for pos, section in enumerate(self.sections):
+            for day in set(section.days):
+                day_buckets.setdefault(day, []).append(pos)
+
+        self.conflict_masks = [0] * len(self.sections)
+        for positions in day_buckets.values():
+            by_start = sorted(positions, key=lambda p: self.sections[p].start_time)
+            by_end = sorted(positions, key=lambda p: self.sections[p].end_time)
+            starts = [self.sections[p].start_time for p in by_start]
+            ends = [self.sections[p].end_time for p in by_end]
+            started = _prefix_masks(by_start, starts)
+            ended = _prefix_masks(by_end, ends)
+            for pos in positions:
+                section = self.sections[pos]
+                self.conflict_masks[pos] |= (started[bisect_left(starts, section.end_time)]
+                                             & ~ended[bisect_right(ends, section.start_time)])
+
+        for pos in range(len(self.sections)):
+            self.conflict_masks[pos] &= ~(1 << pos)
+
+    def add_section(self, section, course_idx):
+        """Index a section added to courses[course_idx] after the index was built"""
+        pos = len(self.sections)
+        self.positions[id(section)] = pos
+        self.sections.append(section)
+        self.course_masks[course_idx] |= 1 << pos
+
+        conflicts = []
+        for other_pos in range(pos):
+            other = self.sections[other_pos]
+            if other.day_mask & section.day_mask and sections_overlap(section, other):
+                conflicts.append(other_pos)
+                self.conflict_masks[other_pos] |= 1 << pos
+        self.conflict_masks.append(mask_from_positions(conflicts))
+
+    def remove_section(self, section, course_idx):
+        """
+        Drop a section removed from courses[course_idx].
+
+        Its bit position stays reserved (and the section referenced) so
+        positions never move, but it no longer belongs to the course or
+        conflicts with anything.
+        """
+        pos = self.positions[id(section)]
+        bit = 1 << pos
+        self.course_masks[course_idx] &= ~bit
+        for other_pos in bit_positions(self.conflict_masks[pos]):
+            self.conflict_masks[other_pos] &= ~bit
+        self.conflict_masks[pos] = 0
+
+    def position(self, section):
+        """Return the bit position of a section"""
+        return self.positions[id(section)]
+
+    def bit(self, section):
+        """Return the single-bit mask of a section"""
+        return 1 << self.positions[id(section)]
+
+    def mask_of(self, sections):
+        """Return the occupied mask of a collection of sections"""
+        mask = 0
+        for section in sections:
+            mask |= 1 << self.positions[id(section)]
+        return mask
+
+    def conflicts(self, sec1, sec2):
+        """Check if two indexed sections overlap"""
+        return (self.conflict_masks[self.positions[id(sec1)]] >> self.positions[id(sec2)]) & 1 == 1
+
+    def conflicts_with(self, section, occupied_mask):
+        """Check if a section overlaps any section in an occupied mask"""
+        return self.conflict_masks[self.positions[id(section)]] & occupied_mask != 0
+
+    def pruned_domains(self, courses, stats, fixed=None):
+        """
+        Return the courses' section masks after prune_domains, timed as the
+        "prune" phase of stats with the removed sections counted in
+        stats.domain_prunes. fixed, a (course index, section) pair, limits that
+        course to the one section.
+        """
+        with stats.phase("prune"):
+            full_domains = [self.mask_of(course.sections) for course in courses]
+            if fixed is not None:
+                course_idx, section = fixed
+                full_domains[course_idx] = self.bit(section)
+            domains = self.prune_domains(full_domains)
+            for before, after in zip(full_domains, domains):
+                stats.domain_prunes += (before & ~after).bit_count()
+        return domains
+
+    def prune_domains(self, domains):
+        """
+        Remove sections that conflict with every remaining section of some other course.
+
+        Takes one section mask per course and returns the pruned masks. Removals
+        are repeated until nothing changes, so a mask that comes back empty means
+        no conflict-free schedule exists.
+        """
+        domains = list(domains)
+        changed = True
+        while changed:
+            changed = False
+            for course_idx, domain in enumerate(domains):
+                remaining = domain
+                for pos in bit_positions(domain):
+                    conflicts = self.conflict_masks[pos]
+                    for other_idx, other in enumerate(domains):
+                        if other_idx != course_idx and other & ~conflicts == 0:
+                            remaining &= ~(1 << pos)
+                            break
+                if remaining != domain:
+                    domains[course_idx] = remaining
+                    changed = True
+        return domains
+
+
 class StudentPreferences:
     def __init__(self):
         # Preference weights (1-10, 10 is highest priority)
@@ -50,329 +283,2058 @@ class StudentPreferences:
         self.preferred_break_time = 60          # 1 hour
         self.max_classes_per_day = 3
 
+        # Days scored, from Monday; 6 includes Saturday, 7 Sunday
+        self.days_per_week = DEFAULT_DAYS_PER_WEEK
+
+
+def check_week(courses, days_per_week):
+    """Raise ValueError if the week length is invalid or a section meets outside it"""
+    if not 1 <= days_per_week <= len(DAY_NAMES):
+        raise ValueError(f"days_per_week must be between 1 and {len(DAY_NAMES)}, not {days_per_week}")
+    for course in courses:
+        for section in course.sections:
+            if section.day_mask >> days_per_week:
+                _raise_outside_week(section, days_per_week)
+
+
+def _raise_outside_week(section, days_per_week):
+    day = max(section.days)
+    day_name = DAY_NAMES[day] if day < len(DAY_NAMES) else f"day {day}"
+    raise ValueError(f"Section {section.section_id} of {section.course_id} meets on {day_name}, "
+                     f"outside the {days_per_week}-day week")
+
+
+def score_day(intervals, preferences):
+    """
+    Score a single day given its (start, end) class times sorted by start time.
+
+    The schedule score is the sum of score_day over the days of the week, so
+    callers that change one day only need to rescore that day.
+    """
+    # Free day (no classes)
+    if not intervals:
+        return preferences.free_days_weight
+
+    score = 0
+
+    # Early dismissal preference
+    last_class_end = max(end for _, end in intervals)
+    if last_class_end <= preferences.preferred_latest_time:
+        score += preferences.early_dismissal_weight
+
+    # No morning classes preference
+    first_class_start = intervals[0][0]
+    if first_class_start >= preferences.preferred_earliest_time:
+        score += preferences.no_morning_weight
+
+    # Check breaks between classes
+    if len(intervals) > 1:
+        good_breaks = 0
+        consecutive_classes = 0
+
+        for i in range(len(intervals) - 1):
+            break_time = intervals[i + 1][0] - intervals[i][1]
+
+            if break_time >= preferences.minimum_break_time:
+                good_breaks += 1
+
+                # Reward for breaks close to preferred length
+                if abs(break_time - preferences.preferred_break_time) <= 15:  # Within 15 minutes
+                    score += preferences.long_breaks_weight
+
+            # Back-to-back classes preference (small breaks)
+            if break_time <= 15:
+                consecutive_classes += 1
+
+        # All breaks are good breaks
+        if good_breaks == len(intervals) - 1:
+            score += 5
+
+        score += consecutive_classes * preferences.consecutive_classes_weight
+
+    # Max classes per day preference
+    if len(intervals) <= preferences.max_classes_per_day:
+        score += 3
+
+    return score
+
+
+# The separate terms of score_day; a day's score is day_criteria . criteria_weights
+CRITERIA = ("free_days", "no_morning_days", "early_dismissal_days", "preferred_breaks", "consecutive_breaks",
+            "all_good_break_days", "max_classes_days")
+
+
+def criteria_weights(preferences):
+    """The weight score_day gives each of CRITERIA; the last two are fixed bonuses"""
+    return (preferences.free_days_weight, preferences.no_morning_weight, preferences.early_dismissal_weight,
+            preferences.long_breaks_weight, preferences.consecutive_classes_weight, 5, 3)
+
+
+def day_criteria(intervals, preferences):
+    """
+    Count score_day's terms for a single day, as a tuple ordered like CRITERIA.
+
+    Only the times, break lengths and max_classes_per_day of preferences are
+    used; the weights are applied later by criteria_weights.
+    """
+    if not intervals:
+        return (1, 0, 0, 0, 0, 0, 0)
+
+    no_morning = int(intervals[0][0] >= preferences.preferred_earliest_time)
+    early_dismissal = int(max(end for _, end in intervals) <= preferences.preferred_latest_time)
+    preferred_breaks = consecutive = good_breaks = 0
+    for i in range(len(intervals) - 1):
+        break_time = intervals[i + 1][0] - intervals[i][1]
+        if break_time >= preferences.minimum_break_time:
+            good_breaks += 1
+            if abs(break_time - preferences.preferred_break_time) <= 15:
+                preferred_breaks += 1
+        if break_time <= 15:
+            consecutive += 1
+    all_good = int(len(intervals) > 1 and good_breaks == len(intervals) - 1)
+    max_classes = int(len(intervals) <= preferences.max_classes_per_day)
+    return (0, no_morning, early_dismissal, preferred_breaks, consecutive, all_good, max_classes)
+
+
+def format_time(minutes):
+    """Format minutes from midnight as a 12-hour clock time, e.g. 1:30 PM"""
+    hour, minute = divmod(minutes, 60)
+    am_pm = "AM" if hour < 12 else "PM"
+    hour = hour if hour <= 12 else hour - 12
+    if hour == 0:
+        hour = 12
+    return f"{hour}:{minute:02d} {am_pm}"
+
 
 class Schedule:
     def __init__(self):
         self.assigned_sections = []  # List of selected sections
         self.score = 0
+        self.optimality_gap = None  # How far from optimal the score may be, when a solver knows
+        self._day_buckets = []  # Per-day lists reused by _group_by_day
+        self.alternatives = {}  # Section -> interchangeable sections (itself first), from collapse_equivalent
     
     def add_section(self, section):
         self.assigned_sections.append(section)
     
     def has_conflicts(self):
         """Check if there are any time conflicts in the schedule"""
-        for i, sec1 in enumerate(self.assigned_sections):
-            for j, sec2 in enumerate(self.assigned_sections):
-                if i != j:
-                    # Check if sections are on the same day
-                    common_days = set(sec1.days).intersection(set(sec2.days))
-                    if common_days:
-                        # Check for time overlap
-                        if not (sec1.end_time <= sec2.start_time or sec1.start_time >= sec2.end_time):
-                            return True
+        sections = self.assigned_sections
+        for i, sec1 in enumerate(sections):
+            for sec2 in sections[i + 1:]:
+                if sections_overlap(sec1, sec2):
+                    return True
         return False
     
+    def _group_by_day(self, days_per_week, times=False):
+        """
+        Return one list per day of the sections meeting on it (or their
+        (start, end) times), sorted by time.
+
+        The lists are allocated once per schedule and cleared in place on
+        later calls, so callers must be done with them before calling again.
+        """
+        buckets = self._day_buckets
+        if len(buckets) != days_per_week:
+            buckets = self._day_buckets = [[] for _ in range(days_per_week)]
+        else:
+            for bucket in buckets:
+                bucket.clear()
+
+        for section in self.assigned_sections:
+            if section.day_mask >> days_per_week:
+                _raise_outside_week(section, days_per_week)
+            item = (section.start_time, section.end_time) if times else section
+            for day in section.days:
+                buckets[day].append(item)
+
+        for bucket in buckets:
+            if times:
+                bucket.sort()
+            else:
+                bucket.sort(key=lambda x: x.start_time)
+        return buckets
+
+    def _render_days(self, days_per_week):
+        # Enough days to show every section: the default week, stretched to the last day used
+        if days_per_week is None:
+            days_per_week = DEFAULT_DAYS_PER_WEEK
+            for section in self.assigned_sections:
+                days_per_week = max(days_per_week, max(section.days, default=0) + 1)
+        return days_per_week
+
     def calculate_score(self, preferences):
         """Calculate schedule score based on student preferences"""
         if self.has_conflicts():
             return -1000  # Heavy penalty for conflicts
-        
+
+        # Group section times by day, sorted by start time, and score each day on its own
         score = 0
-        day_schedules = {day: [] for day in range(5)}  # 0=Monday to 4=Friday
-        
-        # Group sections by day
-        for section in self.assigned_sections:
-            for day in section.days:
-                day_schedules[day].append(section)
-        
-        # Sort each day's sections by start time
-        for day in day_schedules:
-            day_schedules[day].sort(key=lambda x: x.start_time)
-        
-        # Count free days (days with no classes)
-        free_days = sum(1 for day in day_schedules.values() if not day)
-        score += free_days * preferences.free_days_weight
-        
-        # Evaluate each day with classes
-        for day, sections in day_schedules.items():
-            if not sections:
-                continue
-            
-            # Early dismissal preference
-            last_class_end = max(section.end_time for section in sections)
-            if last_class_end <= preferences.preferred_latest_time:
-                score += preferences.early_dismissal_weight
-            
-            # No morning classes preference
-            first_class_start = min(section.start_time for section in sections)
-            if first_class_start >= preferences.preferred_earliest_time:
-                score += preferences.no_morning_weight
-            
-            # Check breaks between classes
-            if len(sections) > 1:
-                total_break_time = 0
-                good_breaks = 0
-                total_gaps = 0
-                
-                for i in range(len(sections) - 1):
-                    break_time = sections[i+1].start_time - sections[i].end_time
-                    total_break_time += break_time
-                    total_gaps += 1
-                    
-                    if break_time >= preferences.minimum_break_time:
-                        good_breaks += 1
-                        
-                        # Reward for breaks close to preferred length
-                        if abs(break_time - preferences.preferred_break_time) <= 15:  # Within 15 minutes
-                            score += preferences.long_breaks_weight
-                
-                # All breaks are good breaks
-                if good_breaks == total_gaps:
-                    score += 5
-                
-                # Back-to-back classes preference (small breaks)
-                consecutive_classes = sum(1 for i in range(len(sections) - 1) 
-                                    if sections[i+1].start_time - sections[i].end_time <= 15)
-                score += consecutive_classes * preferences.consecutive_classes_weight
-            
-            # Max classes per day preference
-            if len(sections) <= preferences.max_classes_per_day:
-                score += 3
-        
+        for intervals in self._group_by_day(preferences.days_per_week, times=True):
+            score += score_day(intervals, preferences)
+
         return score
     
-    def get_sched(self):
-        """Return the schedule as a formatted string"""
+    def write_schedule(self, out, days_per_week=None):
+        """Write the schedule in a readable format to a text file-like object, a line at a time"""
+        out.write("\n===== YOUR OPTIMIZED SCHEDULE =====\n")
+
         # Group sections by day
-        day_schedules = {day: [] for day in range(5)}  # 0=Monday to 4=Friday
-        day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-        
-        for section in self.assigned_sections:
-            for day in section.days:
-                day_schedules[day].append(section)
-        
-        result = "\n===== YOUR OPTIMIZED SCHEDULE =====\n"
-        
-        for day_num, sections in day_schedules.items():
-            result += f"\n{day_names[day_num]}:\n"
+        day_schedules = self._group_by_day(self._render_days(days_per_week))
+        for day_num, sections in enumerate(day_schedules):
+            out.write(f"\n{DAY_NAMES[day_num]}:\n")
             if not sections:
-                result += "  No classes\n"
+                out.write("  No classes\n")
                 continue
-            
-            # Sort sections by start time
-            sections.sort(key=lambda x: x.start_time)
-            
-            for section in sections:
-                start_hour, start_min = divmod(section.start_time, 60)
-                end_hour, end_min = divmod(section.end_time, 60)
-                start_am_pm = "AM" if start_hour < 12 else "PM"
-                end_am_pm = "AM" if end_hour < 12 else "PM"
-                start_hour = start_hour if start_hour <= 12 else start_hour - 12
-                end_hour = end_hour if end_hour <= 12 else end_hour - 12
-                if start_hour == 0: start_hour = 12
-                if end_hour == 0: end_hour = 12
-                
-                result += f"  {start_hour}:{start_min:02d} {start_am_pm} - {end_hour}:{end_min:02d} {end_am_pm}: {section.course_id} (Section {section.section_id})\n"
-                
+
+            for idx, section in enumerate(sections):
+                out.write(f"  {format_time(section.start_time)} - {format_time(section.end_time)}: "
+                          f"{section.course_id} (Section {section.section_id})\n")
+                others = self.alternatives.get(section, ())[1:]
+                if others:
+                    out.write("    Also: " + ", ".join(f"Section {other.section_id} ({other.professor})"
+                                                      for other in others) + "\n")
+
                 # Show break time to next class if applicable
-                if sections.index(section) < len(sections) - 1:
-                    next_section = sections[sections.index(section) + 1]
-                    break_time = next_section.start_time - section.end_time
+                if idx < len(sections) - 1:
+                    break_time = sections[idx + 1].start_time - section.end_time
                     break_hours, break_mins = divmod(break_time, 60)
                     if break_time > 0:
-                        result += f"  ↓ {break_hours}h {break_mins}m break ↓\n"
-        
-        result += f"\nTotal Score: {self.score}\n"
-        
-        return result
-    
-    def print_schedule(self):
+                        out.write(f"  ↓ {break_hours}h {break_mins}m break ↓\n")
+
+        out.write(f"\nTotal Score: {self.score}\n")
+
+    def get_sched(self, days_per_week=None):
+        """Return the schedule as a formatted string"""
+        buffer = io.StringIO()
+        self.write_schedule(buffer, days_per_week)
+        return buffer.getvalue()
+
+    def print_schedule(self, days_per_week=None):
         """Print the schedule in a readable format"""
-        # Group sections by day
-        day_schedules = {day: [] for day in range(5)}  # 0=Monday to 4=Friday
-        day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-        
-        for section in self.assigned_sections:
-            for day in section.days:
-                day_schedules[day].append(section)
-        
-        print("\n===== YOUR OPTIMIZED SCHEDULE =====")
-        
-        for day_num, sections in day_schedules.items():
-            print(f"\n{day_names[day_num]}:")
-            if not sections:
-                print("  No classes")
-                continue
-            
-            # Sort sections by start time
-            sections.sort(key=lambda x: x.start_time)
-            
-            for section in sections:
-                start_hour, start_min = divmod(section.start_time, 60)
-                end_hour, end_min = divmod(section.end_time, 60)
-                start_am_pm = "AM" if start_hour < 12 else "PM"
-                end_am_pm = "AM" if end_hour < 12 else "PM"
-                start_hour = start_hour if start_hour <= 12 else start_hour - 12
-                end_hour = end_hour if end_hour <= 12 else end_hour - 12
-                if start_hour == 0: start_hour = 12
-                if end_hour == 0: end_hour = 12
-                
-                print(f"  {start_hour}:{start_min:02d} {start_am_pm} - {end_hour}:{end_min:02d} {end_am_pm}: {section.course_id} (Section {section.section_id})")
-                
-                # Show break time to next class if applicable
-                if sections.index(section) < len(sections) - 1:
-                    next_section = sections[sections.index(section) + 1]
-                    break_time = next_section.start_time - section.end_time
-                    break_hours, break_mins = divmod(break_time, 60)
-                    if break_time > 0:
-                        print(f"  ↓ {break_hours}h {break_mins}m break ↓")
-        
-        print("\nTotal Score:", self.score)
+        self.write_schedule(sys.stdout, days_per_week)
 
 
-def greedy_schedule_optimizer(courses, preferences):
+class IncrementalSchedule(Schedule):
     """
-    Greedy algorithm to find the best schedule based on student preferences
+    Schedule that keeps each day's classes sorted and maintains a running score.
+
+    push_section and pop_section only rescore the days the section meets on and
+    return the change in score, so a search can score a node in roughly
+    O(days touched) instead of rebuilding the whole schedule. The score always
+    equals calculate_score(preferences), including the conflict penalty.
+    Conflict checks and day rescorings are counted in stats.
     """
-    # Start with an empty schedule
-    schedule = Schedule()
-    
-    # Sort courses by number of available sections (fewer options first)
-    sorted_courses = sorted(courses, key=lambda c: len(c.sections))
-    
-    # Greedily select the best section for each course
-    for course in sorted_courses:
-        best_section = None
-        best_score = float('-inf')
-        
-        # Try each section of this course
+    def __init__(self, preferences, conflict_index=None, stats=None):
+        super().__init__()
+        self.preferences = preferences
+        self.conflict_index = conflict_index
+        self.stats = SearchStats() if stats is None else stats
+        self.occupied = 0  # Occupied mask when a conflict index is available
+        self.conflict_count = 0  # Number of overlapping section pairs
+        self.days_per_week = preferences.days_per_week
+        self.day_intervals = [[] for _ in range(self.days_per_week)]
+        self.day_scores = [preferences.free_days_weight] * self.days_per_week
+        self.raw_score = sum(self.day_scores)
+        self.score = self.raw_score
+
+    def add_section(self, section):
+        self.push_section(section)
+
+    def push_section(self, section):
+        """Add a section and return the score delta"""
+        if section.day_mask >> self.days_per_week:
+            _raise_outside_week(section, self.days_per_week)
+        old_score = self.score
+
+        self.conflict_count += self._count_overlaps(section)
+        if self.conflict_index is not None:
+            self.occupied |= self.conflict_index.bit(section)
+        self.assigned_sections.append(section)
+
+        interval = (section.start_time, section.end_time)
+        for day in section.days:
+            insort(self.day_intervals[day], interval)
+            self._rescore_day(day)
+
+        self._update_score()
+        return self.score - old_score
+
+    def pop_section(self):
+        """Remove the most recently pushed section and return the score delta"""
+        return self._take_out(self.assigned_sections.pop())
+
+    def remove_section(self, section):
+        """Remove any section in the schedule and return the score delta"""
+        for idx in range(len(self.assigned_sections) - 1, -1, -1):
+            if self.assigned_sections[idx] is section:
+                del self.assigned_sections[idx]
+                return self._take_out(section)
+        raise ValueError(f"Section {section.section_id} of {section.course_id} is not in the schedule")
+
+    def _take_out(self, section):
+        # Undo everything push_section did for a section already dropped from assigned_sections
+        old_score = self.score
+
+        if self.conflict_index is not None:
+            self.occupied &= ~self.conflict_index.bit(section)
+        self.conflict_count -= self._count_overlaps(section)
+
+        interval = (section.start_time, section.end_time)
+        for day in section.days:
+            self.day_intervals[day].remove(interval)
+            self._rescore_day(day)
+
+        self._update_score()
+        return self.score - old_score
+
+    def _count_overlaps(self, section):
+        # Sections in the schedule (other than this one) that overlap it
+        if self.conflict_index is not None:
+            self.stats.conflict_checks += 1
+            pos = self.conflict_index.position(section)
+            return (self.conflict_index.conflict_masks[pos] & self.occupied).bit_count()
+        self.stats.conflict_checks += len(self.assigned_sections)
+        return sum(1 for other in self.assigned_sections if sections_overlap(section, other))
+
+    def _rescore_day(self, day):
+        self.stats.score_evaluations += 1
+        new_day_score = score_day(self.day_intervals[day], self.preferences)
+        self.raw_score += new_day_score - self.day_scores[day]
+        self.day_scores[day] = new_day_score
+
+    def _update_score(self):
+        self.score = -1000 if self.conflict_count else self.raw_score
+
+
+class SearchCancelled(Exception):
+    """Raised by a solver that was cancelled before it had any answer to return"""
+
+
+class SearchStats:
+    """
+    Counters filled in by a search; pass one to a solver to see how much work it did.
+
+    Every solver accepts one. The counters are plain integer increments and the
+    phase timings are taken once per phase, so they are cheap enough to leave on.
+    """
+    def __init__(self):
+        self.nodes = 0            # Search nodes expanded
+        self.leaves = 0           # Complete schedules reached
+        self.bound_prunes = 0     # Branches cut because their upper bound could not beat the best
+        self.conflict_prunes = 0  # Sections skipped because they clash with the partial schedule
+        self.domain_prunes = 0    # Sections removed before search for clashing with all of another course
+        self.forward_check_prunes = 0  # Branches cut because some other course had no section left
+        self.color_prunes = 0     # Branches cut because a coloring showed too few compatible sections
+        self.memo_hits = 0        # Subproblems answered from a memo
+        self.memo_misses = 0      # Subproblems that had to be solved
+        self.conflict_checks = 0  # Section-against-schedule (or section pair) clash tests
+        self.score_evaluations = 0  # Days scored with score_day
+        self.phase_times = {}     # Seconds spent per phase: "index", "prune", "search", "build"
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block and add it to phase_times[name]"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - started
+
+    def prunes(self):
+        """Return the pruning counters by reason"""
+        return {"bound": self.bound_prunes, "conflict": self.conflict_prunes,
+                "domain": self.domain_prunes, "forward_check": self.forward_check_prunes,
+                "color": self.color_prunes}
+
+    def as_dict(self):
+        """Return every counter and the phase timings as a plain dict"""
+        counters = dict(vars(self))
+        counters["phase_times"] = dict(self.phase_times)
+        return counters
+
+    def merge(self, other):
+        """Add another SearchStats' counters and phase timings into this one"""
+        for name, value in vars(other).items():
+            if name == "phase_times":
+                for phase, seconds in value.items():
+                    self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+            else:
+                setattr(self, name, getattr(self, name) + value)
+
+    def __str__(self):
+        phases = " ".join(f"{phase}={seconds:.4f}s" for phase, seconds in self.phase_times.items())
+        return (f"nodes={self.nodes} leaves={self.leaves} "
+                f"bound_prunes={self.bound_prunes} conflict_prunes={self.conflict_prunes} "
+                f"domain_prunes={self.domain_prunes} forward_check_prunes={self.forward_check_prunes} "
+                f"color_prunes={self.color_prunes} memo_hits={self.memo_hits} memo_misses={self.memo_misses} "
+                f"conflict_checks={self.conflict_checks} score_evaluations={self.score_evaluations}"
+                + (f" {phases}" if phases else ""))
+
+
+def course_day_masks(course):
+    """Return (days any section meets, days every section meets) as day bitmasks"""
+    union = 0
+    common = None
+    for section in course.sections:
+        union |= section.day_mask
+        common = section.day_mask if common is None else common & section.day_mask
+    return union, common or 0
+
+
+class ScoreBound:
+    """
+    Admissible upper bound on the final score reachable from a partial schedule.
+
+    The score is a sum of independent per-day scores, so each day is bounded on
+    its own. A day no remaining course can reach is already final. Otherwise it
+    gets every bonus that is still attainable: the free-day bonus only if it is
+    empty and no remaining course is forced onto it, the early-dismissal and
+    no-morning bonuses only if the classes already there have not broken them,
+    and the best possible reward for every gap the day could end up with.
+    """
+    def __init__(self, preferences):
+        self.preferences = preferences
+
+        # Best reward a single gap between classes can earn
+        long_low = max(preferences.minimum_break_time, preferences.preferred_break_time - 15)
+        long_high = preferences.preferred_break_time + 15
+        long_reward = max(preferences.long_breaks_weight, 0) if long_low <= long_high else 0
+        consecutive_reward = max(preferences.consecutive_classes_weight, 0)
+        both = long_reward + consecutive_reward if long_low <= min(long_high, 15) else 0
+        self.gap_reward = max(long_reward, consecutive_reward, both)
+
+    def day_bound(self, intervals, day_score, additions, forced):
+        """Upper bound for one day that can still receive up to `additions` classes"""
+        if additions == 0:
+            return day_score
+
+        prefs = self.preferences
+        count = len(intervals)
+        bound = 0
+        if not count or max(end for _, end in intervals) <= prefs.preferred_latest_time:
+            bound += max(prefs.early_dismissal_weight, 0)
+        if not count or intervals[0][0] >= prefs.preferred_earliest_time:
+            bound += max(prefs.no_morning_weight, 0)
+        gaps = count + additions - 1
+        if gaps > 0:
+            bound += gaps * self.gap_reward + 5
+        if max(count, 1) <= prefs.max_classes_per_day:
+            bound += 3
+
+        if not count and not forced:
+            bound = max(bound, prefs.free_days_weight)
+        return bound
+
+    def upper_bound(self, schedule, day_additions, forced_days):
+        """
+        Bound the final score of an IncrementalSchedule.
+
+        day_additions[d] is how many remaining courses can still meet on day d,
+        and forced_days has bit d set if some remaining course must meet on it.
+        """
+        total = 0
+        for day in range(len(schedule.day_intervals)):
+            total += self.day_bound(schedule.day_intervals[day], schedule.day_scores[day],
+                                    day_additions[day], (forced_days >> day) & 1)
+        return total
+
+
+def equivalence_classes(courses):
+    """
+    Group each course's sections that meet on the same days at the same times.
+
+    Scoring only sees days and times, so sections in a class are
+    interchangeable. Returns (courses holding only the first section of each
+    class, {representative: every section of its class, representative first}).
+    """
+    collapsed = []
+    alternatives = {}
+    for course in courses:
+        representatives = Course(course.course_id, course.course_name)
+        by_pattern = {}
         for section in course.sections:
-            # Create a temporary schedule with this section
-            temp_schedule = Schedule()
-            for assigned_section in schedule.assigned_sections:
-                temp_schedule.add_section(assigned_section)
-            temp_schedule.add_section(section)
-            
-            # Calculate the score
-            temp_score = temp_schedule.calculate_score(preferences)
-            
-            # Update best section if this one is better
-            if temp_score > best_score:
-                best_score = temp_score
-                best_section = section
-        
-        # Add the best section to our schedule
-        if best_section:
-            schedule.add_section(best_section)
-    
-    # Calculate final score
-    schedule.score = schedule.calculate_score(preferences)
-    return schedule
+            key = (section.day_mask, section.start_time, section.end_time)
+            members = by_pattern.get(key)
+            if members is None:
+                by_pattern[key] = members = []
+                representatives.add_section(section)
+            members.append(section)
+        for members in by_pattern.values():
+            alternatives[members[0]] = members
+        collapsed.append(representatives)
+    return collapsed, alternatives
 
-def dynamic_programming_scheduler(courses, preferences):
-    """Find optimal schedule using dynamic programming"""
+
+def _collapsible(solver):
+    """
+    Give an exact solver a collapse_equivalent option (on by default): it
+    searches over equivalence_classes and lists each chosen section's class in
+    the result's alternatives. The best score is unchanged; with k, the ranked
+    schedules differ in meeting times, not just in section.
+    """
+    @functools.wraps(solver)
+    def wrapper(courses, preferences, *args, collapse_equivalent=True, **kwargs):
+        if not collapse_equivalent:
+            return solver(courses, preferences, *args, **kwargs)
+        collapsed, alternatives = equivalence_classes(courses)
+        result = solver(collapsed, preferences, *args, **kwargs)
+        for schedule in result if isinstance(result, list) else [result]:
+            schedule.alternatives = {section: alternatives[section] for section in schedule.assigned_sections}
+        return result
+    return wrapper
+
+
+def greedy_schedule_optimizer(courses, preferences, conflict_index=None, stats=None):
+    """
+    Greedy algorithm to find the best schedule based on student preferences
+    """
+    check_week(courses, preferences.days_per_week)
+    if stats is None:
+        stats = SearchStats()
+    if conflict_index is None:
+        with stats.phase("index"):
+            conflict_index = ConflictIndex(courses)
+
+    with stats.phase("search"):
+        # Start with an empty schedule
+        schedule = IncrementalSchedule(preferences, conflict_index, stats)
+
+        # Sort courses by number of available sections (fewer options first)
+        sorted_courses = sorted(courses, key=lambda c: len(c.sections))
+
+        # Greedily select the best section for each course
+        for course in sorted_courses:
+            stats.nodes += 1
+            best_section = None
+            best_score = float('-inf')
+
+            # Try each section of this course
+            for section in course.sections:
+                # Score the schedule with this section added, then take it back out
+                schedule.push_section(section)
+                temp_score = schedule.score
+                schedule.pop_section()
+
+                # Update best section if this one is better
+                if temp_score > best_score:
+                    best_score = temp_score
+                    best_section = section
+
+            # Add the best section to our schedule
+            if best_section:
+                schedule.push_section(best_section)
+        stats.leaves += 1
+
+    # Copy the final schedule and its running score
+    final_schedule = Schedule()
+    for section in schedule.assigned_sections:
+        final_schedule.add_section(section)
+    final_schedule.score = schedule.score
+    return final_schedule
+
+def _dp_search(courses, preferences, conflict_index, stats, zero, day_value, add, reduce, memo_limit, cancel):
+    """
+    The dynamic programming walk shared by dynamic_programming_scheduler and
+    pareto_front, generic over what a day is worth.
+
+    Each day of a completed schedule is valued with day_value(intervals,
+    preferences) and values are combined with add, starting from zero. Every
+    subproblem's completions, as (value, selection) pairs, are passed through
+    reduce, which keeps the ones worth remembering. Returns the root's reduced
+    [(value, sections)].
+
+    The value of the remaining courses only depends on the class times already
+    placed on days those courses can still reach, so the state is the sorted
+    (start, end) times of each such "open" day. A day is valued and dropped from
+    the state as soon as no later course can meet on it. The memo is an LRU
+    bounded by memo_limit entries.
+    """
     n = len(courses)
-    # dp[i][mask] represents best score for first i courses and selected sections represented by mask
-    dp = {}
-    selections = {}
-    
-    def solve(course_idx, selected_sections_mask):
-        # Base case: all courses processed
+
+    # Drop sections that can never be part of a conflict-free schedule
+    domains = conflict_index.pruned_domains(courses, stats)
+
+    # open_days[i] = days that some course in courses[i:] can meet on
+    open_days = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        open_days[i] = open_days[i + 1] | course_day_masks(courses[i])[0]
+
+    # (course_idx, state) -> reduced [(value of the remaining days, section choices)]
+    memo = OrderedDict()
+
+    def seal(state, reachable_days):
+        """Value the days no later course can reach and drop them from the state"""
+        gained = zero
+        state = list(state)
+        for day, intervals in enumerate(state):
+            if intervals is not None and not (reachable_days >> day) & 1:
+                stats.score_evaluations += 1
+                gained = add(gained, day_value(intervals, preferences))
+                state[day] = None
+        return gained, tuple(state)
+
+    def solve(course_idx, state, blocked):
+        # blocked holds every section that clashes with the sections chosen so far;
+        # which future sections it contains only depends on the state
+
+        # Base case: all courses processed and every day already valued
         if course_idx == n:
-            temp_schedule = Schedule()
-            # Convert mask to actual sections
-            for i, course in enumerate(courses):
-                section_idx = (selected_sections_mask >> (i * 4)) & 0xF
-                if section_idx < len(course.sections):
-                    temp_schedule.add_section(course.sections[section_idx])
-            return temp_schedule.calculate_score(preferences), {}
-        
+            return [(zero, ())]
+
         # Return if already computed
-        if (course_idx, selected_sections_mask) in dp:
-            return dp[(course_idx, selected_sections_mask)], selections[(course_idx, selected_sections_mask)]
-        
-        best_score = float('-inf')
-        best_selection = {}
-        
+        key = (course_idx, state)
+        if key in memo:
+            stats.memo_hits += 1
+            memo.move_to_end(key)
+            return memo[key]
+        stats.memo_misses += 1
+        stats.nodes += 1
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled()
+
+        candidates = []
+
         # Try each section of current course
         for section_idx, section in enumerate(courses[course_idx].sections):
-            # Update mask with this section
-            new_mask = selected_sections_mask | (section_idx << (course_idx * 4))
-            
-            # Create temporary schedule to check conflicts
-            temp_schedule = Schedule()
-            for i in range(course_idx):
-                sec_idx = (selected_sections_mask >> (i * 4)) & 0xF
-                if sec_idx < len(courses[i].sections):
-                    temp_schedule.add_section(courses[i].sections[sec_idx])
-            temp_schedule.add_section(section)
-            
+            section_bit = conflict_index.bit(section)
+            if not domains[course_idx] & section_bit:
+                continue
+
             # Skip if this creates conflicts
-            if temp_schedule.has_conflicts():
+            stats.conflict_checks += 1
+            if blocked & section_bit:
+                stats.conflict_prunes += 1
                 continue
-            
+
+            # Forward check: every later course still needs a compatible section
+            new_blocked = blocked | conflict_index.conflict_masks[conflict_index.position(section)]
+            if any(not domains[later] & ~new_blocked for later in range(course_idx + 1, n)):
+                stats.forward_check_prunes += 1
+                continue
+
+            # Place the section's times on its days
+            new_state = list(state)
+            interval = (section.start_time, section.end_time)
+            for day in section.days:
+                intervals = list(new_state[day])
+                insort(intervals, interval)
+                new_state[day] = tuple(intervals)
+            gained, new_state = seal(new_state, open_days[course_idx + 1])
+
             # Recursive call for next course
-            score, selection = solve(course_idx + 1, new_mask)
-            
-            if score > best_score:
-                best_score = score
-                best_selection = selection.copy()
-                best_selection[course_idx] = section_idx
-        
-        dp[(course_idx, selected_sections_mask)] = best_score
-        selections[(course_idx, selected_sections_mask)] = best_selection
-        return best_score, best_selection
-    
-    # Start solving from first course with empty mask
-    final_score, final_selections = solve(0, 0)
-    
-    # Build the schedule from selections
-    final_schedule = Schedule()
-    for course_idx, section_idx in final_selections.items():
-        final_schedule.add_section(courses[course_idx].sections[section_idx])
-    
-    final_schedule.score = final_score
-    return final_schedule
+            for value, selection in solve(course_idx + 1, new_state, new_blocked):
+                candidates.append((add(value, gained), (section_idx,) + selection))
+
+        kept = reduce(candidates)
+        memo[key] = kept
+        if len(memo) > memo_limit:
+            memo.popitem(last=False)
+        return kept
+
+    # Start solving from the first course with every day empty
+    with stats.phase("search"):
+        initial_value, initial_state = seal(((),) * preferences.days_per_week, open_days[0])
+        results = solve(0, initial_state, 0) if all(domains) else []
+
+    # Turn selections back into sections
+    with stats.phase("build"):
+        return [(add(value, initial_value),
+                 tuple(courses[course_idx].sections[section_idx] for course_idx, section_idx in enumerate(selection)))
+                for value, selection in results]
+
+
+@_collapsible
+def dynamic_programming_scheduler(courses, preferences, conflict_index=None, stats=None, memo_limit=100000, k=None,
+                                  cancel=None):
+    """
+    Find optimal schedule using dynamic programming.
+
+    The score of the remaining courses only depends on the class times already
+    placed on days those courses can still reach, so the DP state is the sorted
+    (start, end) times of each such "open" day. A day is scored and dropped from
+    the state as soon as no later course can meet on it. Different section
+    choices that leave the same times behind share one memo entry, and the memo
+    is an LRU bounded by memo_limit entries.
+
+    Sections that clash with every section of another course are removed before
+    the search, and a choice is dropped as soon as it leaves some later course
+    without a compatible section.
+
+    With k set, every subproblem keeps its k best completions and a ranked list
+    of up to k conflict-free schedules is returned instead of a single one.
+
+    cancel can be a threading.Event; setting it makes the solver raise
+    SearchCancelled, since the DP has no partial answer to return.
+    """
+    if k is not None and k < 1:
+        raise ValueError("k must be at least 1")
+    check_week(courses, preferences.days_per_week)
+    if stats is None:
+        stats = SearchStats()
+    if conflict_index is None:
+        with stats.phase("index"):
+            conflict_index = ConflictIndex(courses)
+    keep = 1 if k is None else k
+
+    # Keep the best completions; ties stay in search order
+    results = _dp_search(courses, preferences, conflict_index, stats, 0, score_day, operator.add,
+                         lambda candidates: heapq.nlargest(keep, candidates, key=lambda c: c[0]),
+                         memo_limit, cancel)
+
+    ranked = []
+    for score, sections in results:
+        schedule = Schedule()
+        for section in sections:
+            schedule.add_section(section)
+        schedule.score = score
+        ranked.append(schedule)
+
+    if k is not None:
+        return ranked
+    if not ranked:
+        final_schedule = Schedule()
+        final_schedule.score = float('-inf')
+        return final_schedule
+    return ranked[0]
+
+
+class _BacktrackingSearch:
+    """
+    Branch-and-bound search behind backtracking_scheduler.
+
+    Each course keeps a domain mask of the sections still compatible with the
+    partial schedule. Sections that clash with all of another course are pruned
+    before search, every assignment forward checks the other domains, and the
+    next course is the unassigned one with the fewest sections left (ties go to
+    input order).
+
+    Kept as an object so a parallel worker can replay a prefix of assignments
+    and continue the same search from there.
+    """
+    def __init__(self, courses, preferences, conflict_index, stats, keep=1, shared_best=None, shared_lock=None,
+                 domains=None, time_limit=None, node_limit=None, progress=None, progress_interval=1000,
+                 cancel=None, incumbent=float('-inf')):
+        self.courses = courses
+        self.conflict_index = conflict_index
+        self.stats = stats
+        self.keep = keep
+        self.shared_best = shared_best  # Best score found by any worker, when running in parallel
+        self.shared_lock = shared_lock
+        self.incumbent = incumbent  # Score some complete schedule is known to reach
+        self.score_bound = ScoreBound(preferences)
+        self.schedule = IncrementalSchedule(preferences, conflict_index, stats)
+
+        # Min-heap of (score, -order, sections); on equal scores the earlier find ranks higher
+        self.best = []
+        self.found = 0
+
+        # Anytime budget; once it runs out, open_bound bounds everything left unexplored
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self.node_limit = node_limit
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.cancel = cancel
+        self.nodes = 0
+        self.stopped = False
+        self.open_bound = float('-inf')
+
+        # Domains after pruning sections that can never be part of a schedule
+        if domains is None:
+            domains = conflict_index.pruned_domains(courses, stats)
+        self.domains = list(domains)
+        self.feasible = all(self.domains)
+
+        self.chosen = [None] * len(courses)  # Section chosen for each course, in course order
+        self.unassigned = len(courses)
+
+        # How many unassigned courses can meet (or must meet) on each day, for the score bound
+        self.day_unions = [0] * len(courses)
+        self.day_commons = [0] * len(courses)
+        self.day_additions = [0] * preferences.days_per_week
+        self.forced_counts = [0] * preferences.days_per_week
+        for course_idx, domain in enumerate(self.domains):
+            self._set_domain(course_idx, domain)
+
+    def _count_days(self, course_idx, sign):
+        union = self.day_unions[course_idx]
+        common = self.day_commons[course_idx]
+        for day in range(len(self.day_additions)):
+            self.day_additions[day] += sign * ((union >> day) & 1)
+            self.forced_counts[day] += sign * ((common >> day) & 1)
+
+    def _set_domain(self, course_idx, domain):
+        """Replace an unassigned course's domain and keep the per-day counts in sync"""
+        self._count_days(course_idx, -1)
+        self.domains[course_idx] = domain
+        union = 0
+        common = None
+        for pos in bit_positions(domain):
+            day_mask = self.conflict_index.sections[pos].day_mask
+            union |= day_mask
+            common = day_mask if common is None else common & day_mask
+        self.day_unions[course_idx] = union
+        self.day_commons[course_idx] = common or 0
+        self._count_days(course_idx, 1)
+
+    def assign(self, course_idx, section):
+        """
+        Place a section and forward check the other unassigned courses.
+
+        Returns (undo trail, feasible); feasible is False when some course was
+        left without any compatible section.
+        """
+        self.chosen[course_idx] = section
+        self.unassigned -= 1
+        self._count_days(course_idx, -1)
+        self.schedule.push_section(section)
+
+        trail = []
+        blocked = self.conflict_index.conflict_masks[self.conflict_index.position(section)]
+        self.stats.conflict_checks += self.unassigned
+        for other_idx, domain in enumerate(self.domains):
+            if self.chosen[other_idx] is not None or not domain & blocked:
+                continue
+            trail.append((other_idx, domain))
+            self._set_domain(other_idx, domain & ~blocked)
+            if not self.domains[other_idx]:
+                return trail, False
+        return trail, True
+
+    def unassign(self, course_idx, trail):
+        """Undo assign()"""
+        for other_idx, domain in reversed(trail):
+            self._set_domain(other_idx, domain)
+        self.schedule.pop_section()
+        self._count_days(course_idx, 1)
+        self.unassigned += 1
+        self.chosen[course_idx] = None
+
+    def select_course(self):
+        """Pick the unassigned course with the fewest remaining sections"""
+        best_idx = None
+        best_size = None
+        for course_idx, domain in enumerate(self.domains):
+            if self.chosen[course_idx] is None:
+                size = domain.bit_count()
+                if best_size is None or size < best_size:
+                    best_idx = course_idx
+                    best_size = size
+        return best_idx
+
+    def domain_sections(self, course_idx):
+        """Return (section index, section) pairs still in a course's domain"""
+        domain = self.domains[course_idx]
+        return [(section_idx, section) for section_idx, section in enumerate(self.courses[course_idx].sections)
+                if domain & self.conflict_index.bit(section)]
+
+    def threshold(self):
+        """Score a new schedule has to beat to get into the heap"""
+        return self.best[0][0] if len(self.best) == self.keep else float('-inf')
+
+    def upper_bound(self):
+        """Bound the final score of any completion of the current partial schedule"""
+        forced_days = 0
+        for day, count in enumerate(self.forced_counts):
+            if count:
+                forced_days |= 1 << day
+        return self.score_bound.upper_bound(self.schedule, self.day_additions, forced_days)
+
+    def worth_exploring(self, upper_bound):
+        """Check if a partial schedule with this upper bound can still make it into the heap"""
+        if upper_bound <= self.threshold():
+            return False
+        # Ties with other workers' best (or the incumbent) are still explored so the
+        # result matches a search without them
+        if upper_bound < self.incumbent:
+            return False
+        if self.shared_best is not None and upper_bound < self.shared_best.value:
+            return False
+        return True
+
+    def record(self):
+        """Offer the current complete schedule to the heap"""
+        self.stats.leaves += 1
+        score = self.schedule.score
+        if score <= self.threshold():
+            return
+
+        # Store a copy of the sections to avoid reference issues
+        entry = (score, -self.found, tuple(self.chosen))
+        self.found += 1
+        if len(self.best) == self.keep:
+            heapq.heapreplace(self.best, entry)
+        else:
+            heapq.heappush(self.best, entry)
+
+        if self.shared_best is not None and self.keep == 1 and score > self.shared_best.value:
+            with self.shared_lock:
+                if score > self.shared_best.value:
+                    self.shared_best.value = score
+
+    def branches(self):
+        """Yield after placing each viable section of the next course, undoing it on resume"""
+        course_idx = self.select_course()
+        for section_idx, section in self.domain_sections(course_idx):
+            trail, feasible = self.assign(course_idx, section)
+            if not feasible:
+                self.stats.forward_check_prunes += 1
+            else:
+                upper_bound = self.upper_bound()
+                if not self.worth_exploring(upper_bound):
+                    self.stats.bound_prunes += 1
+                elif self.stopped:
+                    # Out of budget: only remember what this branch could still be worth
+                    self.open_bound = max(self.open_bound, upper_bound)
+                else:
+                    yield course_idx, section_idx
+            self.unassign(course_idx, trail)
+
+    def best_score(self):
+        return max(self.best)[0] if self.best else float('-inf')
+
+    def out_of_budget(self):
+        if self.cancel is not None and self.cancel.is_set():
+            return True
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def backtrack(self):
+        self.stats.nodes += 1
+        self.nodes += 1
 
-def backtracking_scheduler(courses, preferences):
-    """Find optimal schedule using backtracking"""
-    best_schedule = Schedule()
-    best_schedule.score = float('-inf')
-    
-    def backtrack(course_idx, current_schedule):
-        nonlocal best_schedule
-        
         # Base case: all courses processed
-        if course_idx == len(courses):
-            score = current_schedule.calculate_score(preferences)
-            if score > best_schedule.score:
-                # Create a new schedule object to avoid reference issues
-                best_schedule = Schedule()
-                for section in current_schedule.assigned_sections:
-                    best_schedule.add_section(section)
-                best_schedule.score = score
+        if not self.unassigned:
+            self.record()
             return
-        
-        # Try each section of current course
-        for section in courses[course_idx].sections:
-            # Add this section temporarily
-            current_schedule.add_section(section)
-            
-            # Only proceed if no conflicts
-            if not current_schedule.has_conflicts():
-                # Estimate the upper bound of potential score
-                potential_score = current_schedule.calculate_score(preferences)
-                
-                # Only continue exploration if there's potential to improve best score
-                if potential_score > best_schedule.score:
-                    backtrack(course_idx + 1, current_schedule)
-            
-            # Remove the section (backtrack)
-            current_schedule.assigned_sections.pop()
-    
-    # Start backtracking from first course with empty schedule
-    backtrack(0, Schedule())
-    return best_schedule
+
+        if self.stopped or self.out_of_budget():
+            self.stopped = True
+            self.open_bound = max(self.open_bound, self.upper_bound())
+            return
+
+        if self.progress is not None and self.nodes % self.progress_interval == 0:
+            self.progress(self.best_score(), self.nodes)
+
+        for _ in self.branches():
+            self.backtrack()
+
+    def search(self):
+        if self.feasible:
+            self.backtrack()
+        if self.progress is not None:
+            self.progress(self.best_score(), self.nodes)
+
+    def prefixes(self, depth, chosen=()):
+        """List the (course index, section index) assignments of the first `depth` levels, in search order"""
+        if not self.feasible:
+            return []
+        if depth == 0 or not self.unassigned:
+            return [chosen]
+
+        found = []
+        for assignment in self.branches():
+            found.extend(self.prefixes(depth - 1, chosen + (assignment,)))
+        return found
+
+    def ranked(self):
+        """Return the heap as (score, sections) pairs, best first"""
+        return [(score, sections) for score, _, sections in sorted(self.best, reverse=True)]
+
+
+# Per-process state of parallel backtracking workers, set up by _init_parallel_worker
+_worker_state = {}
+
+
+def _init_parallel_worker(courses, preferences, keep, shared_best, shared_lock):
+    _worker_state['courses'] = courses
+    _worker_state['preferences'] = preferences
+    _worker_state['keep'] = keep
+    _worker_state['shared_best'] = shared_best
+    _worker_state['shared_lock'] = shared_lock
+    _worker_state['conflict_index'] = conflict_index = ConflictIndex(courses)
+    _worker_state['domains'] = conflict_index.pruned_domains(courses, SearchStats())
+    _worker_state['section_positions'] = {
+        id(section): section_idx
+        for course in courses
+        for section_idx, section in enumerate(course.sections)
+    }
+
+
+def _solve_subproblem(prefix):
+    """Search below one prefix of section choices; returns ranked (score, section indices) and stats"""
+    courses = _worker_state['courses']
+    stats = SearchStats()
+    search = _BacktrackingSearch(courses, _worker_state['preferences'], _worker_state['conflict_index'],
+                                 stats, _worker_state['keep'], _worker_state['shared_best'],
+                                 _worker_state['shared_lock'], _worker_state['domains'])
+    with stats.phase("search"):
+        for course_idx, section_idx in prefix:
+            search.assign(course_idx, courses[course_idx].sections[section_idx])
+        search.backtrack()
+
+    positions = _worker_state['section_positions']
+    results = [(score, tuple(positions[id(section)] for section in sections))
+               for score, sections in search.ranked()]
+    return results, stats
+
+
+def _parallel_backtracking(courses, preferences, conflict_index, stats, keep, workers, split_depth):
+    """Split the search on the first courses' section choices and solve the pieces in a process pool"""
+    # Subproblems come out in the serial search order, which is what breaks ties below
+    splitter = _BacktrackingSearch(courses, preferences, conflict_index, stats, keep)
+    prefixes = splitter.prefixes(split_depth)
+
+    shared_best = multiprocessing.RawValue('d', float('-inf'))
+    shared_lock = multiprocessing.Lock()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parallel_worker,
+                             initargs=(courses, preferences, keep, shared_best, shared_lock)) as pool:
+        results = list(pool.map(_solve_subproblem, prefixes))
+
+    merged = []
+    for prefix_order, (ranked, worker_stats) in enumerate(results):
+        stats.merge(worker_stats)
+        for rank, (score, selection) in enumerate(ranked):
+            merged.append((-score, prefix_order, rank, score, selection))
+    merged.sort()
+
+    return [(score, tuple(courses[course_idx].sections[section_idx]
+                          for course_idx, section_idx in enumerate(selection)))
+            for _, _, _, score, selection in merged[:keep]]
+
+
+@_collapsible
+def backtracking_scheduler(courses, preferences, conflict_index=None, stats=None, k=None,
+                           workers=None, split_depth=2, time_limit=None, node_limit=None,
+                           progress=None, progress_interval=1000, cancel=None):
+    """
+    Find optimal schedule using backtracking with branch and bound.
+
+    Sections that clash with every section of another course are removed up
+    front, each assignment forward checks the remaining courses, and courses
+    are visited fewest-sections-left first. A branch is only explored if the
+    ScoreBound upper bound on its final score beats the best complete schedule
+    found so far. Pass a SearchStats to collect node, pruning and timing counts.
+
+    With k set, the k best conflict-free schedules are kept in a bounded heap,
+    the k-th best score becomes the pruning bound, and a ranked list of
+    schedules is returned instead of a single one.
+
+    With workers > 1, the search tree is split on the section choices of the
+    first split_depth levels and the subproblems run in a process pool. Workers
+    share the best score found so far to prune against, and results are merged
+    in serial search order so the answer is identical to the serial solver's.
+
+    Anytime mode: with time_limit (seconds) or node_limit set, the search stops
+    when the budget runs out and returns the best schedule found so far. Each
+    returned schedule's optimality_gap is how much better an unexplored schedule
+    could still be (0 once the search has finished). progress, if given, is
+    called as progress(best_score, nodes) every progress_interval nodes and once
+    at the end. cancel can be a threading.Event; setting it stops the search
+    like an exhausted budget.
+    """
+    if k is not None and k < 1:
+        raise ValueError("k must be at least 1")
+    check_week(courses, preferences.days_per_week)
+    if stats is None:
+        stats = SearchStats()
+    if conflict_index is None:
+        with stats.phase("index"):
+            conflict_index = ConflictIndex(courses)
+    keep = 1 if k is None else k
+
+    upper_bound = float('-inf')
+    if workers is not None and workers > 1:
+        if time_limit is not None or node_limit is not None or progress is not None or cancel is not None:
+            raise ValueError("Budgets, progress callbacks and cancel need a serial search (workers=None)")
+        results = _parallel_backtracking(courses, preferences, conflict_index, stats, keep, workers, split_depth)
+    else:
+        search = _BacktrackingSearch(courses, preferences, conflict_index, stats, keep,
+                                     time_limit=time_limit, node_limit=node_limit,
+                                     progress=progress, progress_interval=progress_interval, cancel=cancel)
+        with stats.phase("search"):
+            search.search()
+        results = search.ranked()
+        if search.stopped:
+            upper_bound = search.open_bound
+
+    ranked = []
+    with stats.phase("build"):
+        for score, sections in results:
+            schedule = Schedule()
+            for section in sections:
+                schedule.add_section(section)
+            schedule.score = score
+            schedule.optimality_gap = max(upper_bound - score, 0)
+            ranked.append(schedule)
+
+    if k is not None:
+        return ranked
+    if not ranked:
+        best_schedule = Schedule()
+        best_schedule.score = float('-inf')
+        best_schedule.optimality_gap = float('inf') if upper_bound > float('-inf') else 0
+        return best_schedule
+    return ranked[0]
+
+def local_search_scheduler(courses, preferences, conflict_index=None, stats=None, iterations=20000,
+                           time_limit=None, seed=None, pair_probability=0.3, initial_temperature=10.0,
+                           final_temperature=0.1, progress=None, progress_interval=1000, cancel=None):
+    """
+    Improve the greedy schedule with simulated annealing.
+
+    Starting from greedy_schedule_optimizer's result, each step moves one course
+    (or, with probability pair_probability, two courses at once) to another of
+    its sections and is scored by the change in a running IncrementalSchedule.
+    Better moves are always taken and worse ones with probability
+    exp(delta / temperature), the temperature cooling geometrically from
+    initial_temperature to final_temperature over the budget. While annealing,
+    every clashing pair costs 1000 so the walk can pass through conflicts, but
+    only conflict-free schedules are kept as the answer. The result is never
+    worse than greedy's.
+
+    Stops after `iterations` moves or time_limit seconds, whichever comes first;
+    with an iteration budget the same seed always gives the same schedule.
+    progress and cancel work as in backtracking_scheduler.
+    """
+    if iterations is None and time_limit is None:
+        raise ValueError("Local search needs an iteration budget or a time_limit")
+    if stats is None:
+        stats = SearchStats()
+    if conflict_index is None:
+        with stats.phase("index"):
+            conflict_index = ConflictIndex(courses)
+    rng = random.Random(seed)
+
+    greedy = greedy_schedule_optimizer(courses, preferences, conflict_index, stats)
+
+    # Only move to sections that can be part of a conflict-free schedule, if there is one
+    domains = conflict_index.pruned_domains(courses, stats)
+    if not all(domains):
+        domains = [conflict_index.mask_of(course.sections) for course in courses]
+    candidates = [[section for section in course.sections if domain & conflict_index.bit(section)]
+                  for course, domain in zip(courses, domains)]
+    movable = [course_idx for course_idx, options in enumerate(candidates) if len(options) > 1]
+
+    # Greedy's choice for each course, in course order
+    course_of = {id(section): course_idx
+                 for course_idx, course in enumerate(courses)
+                 for section in course.sections}
+    chosen = [None] * len(courses)
+    for section in greedy.assigned_sections:
+        chosen[course_of[id(section)]] = section
+
+    schedule = IncrementalSchedule(preferences, conflict_index, stats)
+    for section in chosen:
+        if section is not None:
+            schedule.push_section(section)
+
+    def energy():
+        return schedule.raw_score - 1000 * schedule.conflict_count
+
+    best_score = greedy.score
+    best = None
+    current = energy()
+    started = time.perf_counter()
+    step = 0
+    with stats.phase("search"):
+        while movable:
+            if iterations is not None and step >= iterations:
+                break
+            fraction = step / iterations if iterations is not None else 0.0
+            if time_limit is not None:
+                elapsed = time.perf_counter() - started
+                if elapsed >= time_limit:
+                    break
+                fraction = max(fraction, elapsed / time_limit)
+            if cancel is not None and cancel.is_set():
+                break
+            temperature = initial_temperature * (final_temperature / initial_temperature) ** fraction
+            step += 1
+            stats.nodes += 1
+
+            if len(movable) > 1 and rng.random() < pair_probability:
+                picked = rng.sample(movable, 2)
+            else:
+                picked = [rng.choice(movable)]
+
+            # Move each picked course to a different section
+            moves = []
+            for course_idx in picked:
+                options = candidates[course_idx]
+                old_section = chosen[course_idx]
+                pick = rng.randrange(len(options))
+                if options[pick] is old_section:
+                    pick = (pick + 1 + rng.randrange(len(options) - 1)) % len(options)
+                new_section = options[pick]
+                if old_section is not None:
+                    schedule.remove_section(old_section)
+                schedule.push_section(new_section)
+                chosen[course_idx] = new_section
+                moves.append((course_idx, old_section, new_section))
+
+            delta = energy() - current
+            if delta >= 0 or rng.random() < math.exp(delta / temperature):
+                current += delta
+                if not schedule.conflict_count and schedule.score > best_score:
+                    best_score = schedule.score
+                    best = list(chosen)
+            else:
+                for course_idx, old_section, new_section in reversed(moves):
+                    schedule.remove_section(new_section)
+                    if old_section is not None:
+                        schedule.push_section(old_section)
+                    chosen[course_idx] = old_section
+
+            if progress is not None and step % progress_interval == 0:
+                progress(best_score, step)
+
+    if progress is not None:
+        progress(best_score, step)
+    if best is None:
+        return greedy
+
+    final_schedule = Schedule()
+    for section in best:
+        if section is not None:
+            final_schedule.add_section(section)
+    final_schedule.score = best_score
+    return final_schedule
+
+class _BeamNode:
+    """
+    One partial schedule in the beam.
+
+    Nodes link to their parent instead of copying its sections, and keep each
+    day's sorted (start, end) times as tuples, so a child only builds new
+    tuples for the days its section meets on and shares the rest.
+    """
+    __slots__ = ("parent", "section", "day_intervals", "day_scores", "raw_score", "conflicts", "occupied")
+
+    def __init__(self, parent, section, day_intervals, day_scores, raw_score, conflicts, occupied):
+        self.parent = parent
+        self.section = section
+        self.day_intervals = day_intervals
+        self.day_scores = day_scores
+        self.raw_score = raw_score
+        self.conflicts = conflicts
+        self.occupied = occupied
+
+    @property
+    def score(self):
+        return -1000 if self.conflicts else self.raw_score
+
+    def sections(self):
+        """Return the chosen sections, first choice first"""
+        chosen = []
+        node = self
+        while node.section is not None:
+            chosen.append(node.section)
+            node = node.parent
+        chosen.reverse()
+        return chosen
+
+
+def beam_search_scheduler(courses, preferences, beam_width=8, conflict_index=None, stats=None):
+    """
+    Beam search over section choices.
+
+    Courses are visited in the same order as greedy_schedule_optimizer (fewest
+    sections first) and after each course only the beam_width best partial
+    schedules are kept, ranked by their score so far with ties going to the
+    earlier candidate. beam_width=1 gives exactly the greedy schedule; a beam
+    at least as wide as the number of section combinations is exhaustive.
+    """
+    if beam_width < 1:
+        raise ValueError("beam_width must be at least 1")
+    check_week(courses, preferences.days_per_week)
+    if stats is None:
+        stats = SearchStats()
+    if conflict_index is None:
+        with stats.phase("index"):
+            conflict_index = ConflictIndex(courses)
+
+    days_per_week = preferences.days_per_week
+    empty_day_score = preferences.free_days_weight
+    beam = [_BeamNode(None, None, ((),) * days_per_week, (empty_day_score,) * days_per_week,
+                      empty_day_score * days_per_week, 0, 0)]
+
+    with stats.phase("search"):
+        for course in sorted(courses, key=lambda c: len(c.sections)):
+            if not course.sections:
+                continue
+            candidates = []
+            for node in beam:
+                stats.nodes += 1
+                for section in course.sections:
+                    pos = conflict_index.position(section)
+                    stats.conflict_checks += 1
+                    conflicts = node.conflicts + (conflict_index.conflict_masks[pos] & node.occupied).bit_count()
+
+                    # Only the days this section meets on get new tuples
+                    day_intervals = list(node.day_intervals)
+                    day_scores = list(node.day_scores)
+                    raw_score = node.raw_score
+                    interval = (section.start_time, section.end_time)
+                    for day in section.days:
+                        intervals = list(day_intervals[day])
+                        insort(intervals, interval)
+                        day_intervals[day] = tuple(intervals)
+                        stats.score_evaluations += 1
+                        day_scores[day] = score_day(day_intervals[day], preferences)
+                        raw_score += day_scores[day] - node.day_scores[day]
+
+                    candidates.append(_BeamNode(node, section, tuple(day_intervals), tuple(day_scores),
+                                                raw_score, conflicts, node.occupied | (1 << pos)))
+
+            # nlargest is stable, so equal scores keep candidate order like greedy's strict > does
+            beam = heapq.nlargest(beam_width, candidates, key=lambda candidate: candidate.score)
+        stats.leaves += len(beam)
+
+    best = beam[0]
+    final_schedule = Schedule()
+    for section in best.sections():
+        final_schedule.add_section(section)
+    final_schedule.score = best.score
+    return final_schedule
+
+def _color_count(candidates, adjacency, enough):
+    """
+    Greedily color the candidate sections so no two compatible ones share a
+    color, stopping once `enough` colors are used. A schedule takes pairwise
+    compatible sections, so it can't use more sections than there are colors.
+    This bounds how many courses can still be placed, not the score.
+    """
+    colors = 0
+    uncolored = candidates
+    while uncolored:
+        colors += 1
+        if colors >= enough:
+            return colors
+        # Grow one color class from sections that clash with everything already in it
+        available = uncolored
+        while available:
+            low = available & -available
+            uncolored &= ~low
+            available &= ~low & ~adjacency[low.bit_length() - 1]
+    return colors
+
+
+@_collapsible
+def clique_scheduler(courses, preferences, conflict_index=None, stats=None):
+    """
+    Find the optimal schedule as a maximum-weight clique search.
+
+    Sections are vertices, compatible sections of different courses are
+    adjacent, and a schedule is a clique with one vertex per course. The search
+    keeps the candidate set as one bitset: choosing a section ANDs it with the
+    section's neighbours. A node is cut if some course has no candidate left,
+    if a greedy coloring of the candidates shows fewer colors than courses
+    still to place, or if the ScoreBound day bound can't beat the best schedule
+    so far. The coloring is only a size check; the score bound is ScoreBound's,
+    as in backtracking_scheduler. Leaves are scored exactly. The greedy
+    schedule, when conflict-free, is the starting incumbent.
+    """
+    check_week(courses, preferences.days_per_week)
+    if stats is None:
+        stats = SearchStats()
+    if conflict_index is None:
+        with stats.phase("index"):
+            conflict_index = ConflictIndex(courses)
+
+    domains = conflict_index.pruned_domains(courses, stats)
+
+    best_score = float('-inf')
+    best = None
+    greedy = greedy_schedule_optimizer(courses, preferences, conflict_index, stats)
+    if not greedy.has_conflicts() and len(greedy.assigned_sections) == len(courses):
+        best_score = greedy.score
+        best = greedy.assigned_sections
+
+    if all(domains):
+        # Compatibility graph over the sections left after pruning
+        vertices = 0
+        for domain in domains:
+            vertices |= domain
+        adjacency = [0] * len(conflict_index.sections)
+        for domain in domains:
+            for pos in bit_positions(domain):
+                adjacency[pos] = vertices & ~domain & ~conflict_index.conflict_masks[pos]
+        day_bits = [0] * preferences.days_per_week
+        for pos in bit_positions(vertices):
+            for day in conflict_index.sections[pos].days:
+                day_bits[day] |= 1 << pos
+
+        score_bound = ScoreBound(preferences)
+        schedule = IncrementalSchedule(preferences, conflict_index, stats)
+        chosen = [None] * len(courses)
+
+        def expand(candidates, unassigned):
+            nonlocal best_score, best
+            stats.nodes += 1
+            if not unassigned:
+                stats.leaves += 1
+                if schedule.score > best_score:
+                    best_score = schedule.score
+                    best = list(chosen)
+                return
+
+            # Forward check, pick the course with the fewest candidates, and count days for the bound
+            day_additions = [0] * len(day_bits)
+            forced_days = 0
+            pick = None
+            pick_size = None
+            for course_idx in unassigned:
+                domain = candidates & domains[course_idx]
+                if not domain:
+                    stats.forward_check_prunes += 1
+                    return
+                size = domain.bit_count()
+                if pick is None or size < pick_size:
+                    pick = course_idx
+                    pick_size = size
+                for day, bits in enumerate(day_bits):
+                    if domain & bits:
+                        day_additions[day] += 1
+                        if not domain & ~bits:
+                            forced_days |= 1 << day
+
+            if _color_count(candidates, adjacency, len(unassigned)) < len(unassigned):
+                stats.color_prunes += 1
+                return
+            if score_bound.upper_bound(schedule, day_additions, forced_days) <= best_score:
+                stats.bound_prunes += 1
+                return
+
+            rest = [course_idx for course_idx in unassigned if course_idx != pick]
+            for pos in bit_positions(candidates & domains[pick]):
+                section = conflict_index.sections[pos]
+                chosen[pick] = section
+                schedule.push_section(section)
+                expand(candidates & adjacency[pos], rest)
+                schedule.pop_section()
+            chosen[pick] = None
+
+        with stats.phase("search"):
+            expand(vertices, list(range(len(courses))))
+
+    final_schedule = Schedule()
+    for section in best or ():
+        final_schedule.add_section(section)
+    final_schedule.score = best_score
+    return final_schedule
+
+
+def _criteria_thresholds(preferences):
+    # Everything day_criteria reads; a front is only valid for these values
+    return (preferences.preferred_earliest_time, preferences.preferred_latest_time, preferences.minimum_break_time,
+            preferences.preferred_break_time, preferences.max_classes_per_day, preferences.days_per_week)
+
+
+def _add_criteria(a, b):
+    return tuple(x + y for x, y in zip(a, b))
+
+
+def _nondominated(candidates):
+    """Keep the (criteria, ...) candidates no other candidate beats or ties on every criterion"""
+    # A dominating vector has a larger sum, so it is always kept before the ones it dominates
+    kept = []
+    for candidate in sorted(candidates, key=lambda c: -sum(c[0])):
+        vector = candidate[0]
+        if not any(all(x >= y for x, y in zip(other[0], vector)) for other in kept):
+            kept.append(candidate)
+    return kept
+
+
+class ParetoFront:
+    """
+    The Pareto-optimal conflict-free schedules over CRITERIA.
+
+    For any non-negative weights the best schedule is on the front, so once it
+    is computed (see pareto_front) new preference weights are answered with a
+    dot product per entry instead of a new search. The times, break lengths and
+    max classes per day must match the preferences the front was built with.
+    """
+
+    def __init__(self, entries, preferences, alternatives=None):
+        self.entries = entries  # [(criteria totals, sections)]
+        self.thresholds = _criteria_thresholds(preferences)
+        self.alternatives = alternatives or {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _weights(self, preferences):
+        if _criteria_thresholds(preferences) != self.thresholds:
+            raise ValueError("The front was computed for different times or break lengths; compute a new one")
+        weights = criteria_weights(preferences)
+        if min(weights) < 0:
+            raise ValueError("Pareto front ranking needs non-negative weights")
+        return weights
+
+    def ranked(self, preferences, k=None):
+        """Return the front's schedules scored for preferences, best first (the first k with k set)"""
+        weights = self._weights(preferences)
+        scored = [(sum(w * c for w, c in zip(weights, vector)), sections) for vector, sections in self.entries]
+        scored.sort(key=lambda entry: -entry[0])
+        ranked = []
+        for score, sections in scored[:k]:
+            schedule = Schedule()
+            for section in sections:
+                schedule.add_section(section)
+            schedule.score = score
+            if self.alternatives:
+                schedule.alternatives = {section: self.alternatives[section] for section in sections}
+            ranked.append(schedule)
+        return ranked
+
+    def best(self, preferences):
+        """Return the best schedule for preferences, or an empty one scored -inf if there is none"""
+        ranked = self.ranked(preferences, k=1)
+        if ranked:
+            return ranked[0]
+        final_schedule = Schedule()
+        final_schedule.score = float('-inf')
+        return final_schedule
+
+
+def pareto_front(courses, preferences, conflict_index=None, stats=None, collapse_equivalent=True, memo_limit=100000,
+                 cancel=None):
+    """
+    Compute the ParetoFront of conflict-free schedules over CRITERIA.
+
+    Runs the dynamic_programming_scheduler walk over day_criteria vectors, and
+    every subproblem keeps all of its non-dominated completions instead of the
+    best one. Only the thresholds of preferences matter here; the weights are
+    applied when the front is ranked. The front grows with the number of
+    trade-offs, so this is slower than a single solve and pays off when the
+    same catalog is re-ranked many times.
+
+    cancel can be a threading.Event; setting it raises SearchCancelled.
+    """
+    check_week(courses, preferences.days_per_week)
+    if stats is None:
+        stats = SearchStats()
+    alternatives = None
+    if collapse_equivalent:
+        courses, alternatives = equivalence_classes(courses)
+    if conflict_index is None:
+        with stats.phase("index"):
+            conflict_index = ConflictIndex(courses)
+
+    entries = _dp_search(courses, preferences, conflict_index, stats, (0,) * len(CRITERIA), day_criteria,
+                         _add_criteria, _nondominated, memo_limit, cancel)
+    return ParetoFront(entries, preferences, alternatives)
+
+
+def _conflict_free_sections(conflict_index, domains, stats, cancel=None):
+    """
+    Return one section position per domain mask with no two overlapping, or None.
+
+    A satisfiability search with no scoring: prune_domains first, then depth
+    first over the course with the fewest sections left, forward checking the
+    others. That makes it much cheaper than any of the solvers. Setting cancel
+    raises SearchCancelled.
+    """
+    domains = conflict_index.prune_domains(domains)
+    if not all(domains):
+        return None
+    chosen = [None] * len(domains)
+
+    def extend(domains, unassigned):
+        if not unassigned:
+            return True
+        pick = min(unassigned, key=lambda course_idx: domains[course_idx].bit_count())
+        rest = [course_idx for course_idx in unassigned if course_idx != pick]
+        for pos in bit_positions(domains[pick]):
+            stats.nodes += 1
+            if cancel is not None and cancel.is_set():
+                raise SearchCancelled()
+            conflicts = conflict_index.conflict_masks[pos]
+            new_domains = list(domains)
+            for course_idx in rest:
+                new_domains[course_idx] = domains[course_idx] & ~conflicts
+                if not new_domains[course_idx]:
+                    stats.forward_check_prunes += 1
+                    break
+            else:
+                chosen[pick] = pos
+                if extend(new_domains, rest):
+                    return True
+        return False
+
+    return chosen if extend(domains, list(range(len(domains)))) else None
+
+
+def conflicting_core(courses, conflict_index=None, stats=None, cancel=None):
+    """
+    Return a minimal list of courses that can't all be taken together, or []
+    if a conflict-free schedule exists.
+
+    The core is minimal: dropping any one of its courses makes the rest
+    schedulable, so it tells the student exactly which courses to choose
+    between. Only the pairwise conflicts are searched, never the scores.
+    cancel can be a threading.Event; setting it raises SearchCancelled.
+    """
+    if stats is None:
+        stats = SearchStats()
+    collapsed, _ = equivalence_classes(courses)
+    if conflict_index is None:
+        with stats.phase("index"):
+            conflict_index = ConflictIndex(collapsed)
+    domains = [conflict_index.mask_of(course.sections) for course in collapsed]
+
+    with stats.phase("search"):
+        if _conflict_free_sections(conflict_index, domains, stats, cancel) is not None:
+            return []
+
+        # Deletion filter: drop each course whose removal leaves the rest still infeasible
+        core = list(range(len(courses)))
+        for course_idx in list(core):
+            trial = [other for other in core if other != course_idx]
+            if _conflict_free_sections(conflict_index, [domains[other] for other in trial], stats, cancel) is None:
+                core = trial
+    return [courses[course_idx] for course_idx in core]
+
+
+@_collapsible
+def max_coverage_scheduler(courses, preferences, priorities=None, conflict_index=None, stats=None, progress=None,
+                           progress_interval=1000, cancel=None):
+    """
+    Find the best schedule of as many courses as can be taken together.
+
+    priorities maps course_id to a positive weight (1 for courses not listed).
+    The schedule maximizes the total priority of the courses it covers and,
+    among the sets of courses that reach it, the preference score. Uncovered
+    courses are simply left out. When every course fits, this is the
+    backtracking_scheduler schedule.
+
+    progress, if given, is called as progress(best_score, nodes) every
+    progress_interval nodes. cancel can be a threading.Event; setting it raises
+    SearchCancelled, since a partial answer could cover the wrong courses.
+    """
+    check_week(courses, preferences.days_per_week)
+    if stats is None:
+        stats = SearchStats()
+    if conflict_index is None:
+        with stats.phase("index"):
+            conflict_index = ConflictIndex(courses)
+
+    priorities = priorities or {}
+    weights = [priorities.get(course.course_id, 1) for course in courses]
+    if any(weight <= 0 for weight in weights):
+        raise ValueError("Course priorities must be positive")
+    domains = [conflict_index.mask_of(course.sections) for course in courses]
+    n = len(courses)
+    best_score, best_sections = float('-inf'), ()
+
+    def tick():
+        stats.nodes += 1
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled()
+        if progress is not None and stats.nodes % progress_interval == 0:
+            progress(best_score, stats.nodes)
+
+    with stats.phase("search"):
+        feasible = _conflict_free_sections(conflict_index, domains, stats, cancel) is not None
+    if feasible:
+        schedule = backtracking_scheduler(courses, preferences, conflict_index=conflict_index, stats=stats,
+                                          progress=progress, progress_interval=progress_interval, cancel=cancel,
+                                          collapse_equivalent=False)
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled()
+        return schedule
+
+    with stats.phase("search"):
+        # Highest total priority any conflict-free selection reaches: branch on each
+        # section or on skipping the course, bounded by the courses still placeable
+        order = sorted(range(n), key=lambda course_idx: domains[course_idx].bit_count())
+        best_coverage = -1
+
+        def cover(depth, blocked, covered):
+            nonlocal best_coverage
+            tick()
+            bound = covered + sum(weights[course_idx] for course_idx in order[depth:]
+                                  if domains[course_idx] & ~blocked)
+            if bound <= best_coverage:
+                stats.bound_prunes += 1
+                return
+            if depth == n:
+                best_coverage = covered
+                return
+            course_idx = order[depth]
+            for pos in bit_positions(domains[course_idx] & ~blocked):
+                cover(depth + 1, blocked | conflict_index.conflict_masks[pos], covered + weights[course_idx])
+            cover(depth + 1, blocked, covered)
+
+        cover(0, 0, 0)
+
+        # Every schedulable set of courses with that priority; the best scored one wins
+        subsets = []
+
+        def choose(depth, kept, kept_weight):
+            tick()
+            remaining = sum(weights[course_idx] for course_idx in order[depth:])
+            if kept_weight + remaining < best_coverage:
+                return
+            if not all(conflict_index.prune_domains([domains[course_idx] for course_idx in kept])):
+                stats.domain_prunes += 1
+                return
+            if depth == n:
+                if _conflict_free_sections(conflict_index, [domains[course_idx] for course_idx in kept],
+                                           stats, cancel) is not None:
+                    subsets.append(sorted(kept))
+                return
+            course_idx = order[depth]
+            if kept_weight + weights[course_idx] <= best_coverage:
+                choose(depth + 1, kept + [course_idx], kept_weight + weights[course_idx])
+            choose(depth + 1, kept, kept_weight)
+
+        choose(0, [], 0)
+
+    # One search per set, most promising first; each only looks for a better
+    # schedule than the sets before it, and sets whose bound can't beat it are skipped
+    def report(score, _):
+        progress(score, stats.nodes)
+
+    searches = [_BacktrackingSearch([courses[course_idx] for course_idx in subset], preferences, conflict_index, stats,
+                                    progress=report if progress is not None else None,
+                                    progress_interval=progress_interval, cancel=cancel)
+                for subset in subsets]
+    bounds = [search.upper_bound() for search in searches]
+    for subset_idx in sorted(range(len(searches)), key=lambda subset_idx: -bounds[subset_idx]):
+        if bounds[subset_idx] <= best_score:
+            stats.bound_prunes += 1
+            break
+        search = searches[subset_idx]
+        if best_score > float('-inf'):
+            # Seed the heap with the best schedule so far, so ties with it are pruned too
+            search.best = [(best_score, 1, best_sections)]
+        with stats.phase("search"):
+            search.search()
+        if search.stopped:
+            raise SearchCancelled()
+        ranked = search.ranked()
+        if ranked and ranked[0][0] > best_score:
+            best_score, best_sections = ranked[0]
+
+    final_schedule = Schedule()
+    for section in best_sections:
+        final_schedule.add_section(section)
+    final_schedule.score = best_score
+    return final_schedule
+
+# Solvers by the algorithm names batch_schedule accepts
+SOLVERS = {
+    "greedy": greedy_schedule_optimizer,
+    "dynamic": dynamic_programming_scheduler,
+    "backtracking": backtracking_scheduler,
+    "local_search": local_search_scheduler,
+    "beam": beam_search_scheduler,
+    "clique": clique_scheduler,
+    "max_coverage": max_coverage_scheduler,
+}
+
+
+def profile_solver(solver, *args, output=None, sort="cumulative", limit=30, **kwargs):
+    """
+    Run solver(*args, **kwargs) under cProfile and return its result.
+
+    With output a path, the raw profile is dumped there for pstats or a viewer
+    such as snakeviz. Otherwise the top `limit` functions by `sort` are printed
+    to output (an open text file) or stdout.
+    """
+    profiler = cProfile.Profile()
+    try:
+        result = profiler.runcall(solver, *args, **kwargs)
+    finally:
+        if isinstance(output, str):
+            profiler.dump_stats(output)
+        else:
+            pstats.Stats(profiler, stream=output or sys.stdout).sort_stats(sort).print_stats(limit)
+    return result
+
+
+def section_positions(courses):
+    """Map id(section) to its (course index, section index) in a course list"""
+    return {
+        id(section): (course_idx, section_idx)
+        for course_idx, course in enumerate(courses)
+        for section_idx, section in enumerate(course.sections)
+    }
+
+
+def pack_result(result, positions):
+    """
+    Turn a solver result (a Schedule or a ranked list) into plain section
+    positions that are cheap to pickle and can be rebuilt with unpack_result.
+    """
+    schedules = result if isinstance(result, list) else [result]
+    return isinstance(result, list), [
+        (schedule.score, schedule.optimality_gap,
+         tuple(positions[id(section)] for section in schedule.assigned_sections),
+         tuple(tuple(positions[id(other)] for other in schedule.alternatives.get(section, ()))
+               for section in schedule.assigned_sections))
+        for schedule in schedules
+    ]
+
+
+def unpack_result(packed, courses):
+    """Rebuild a packed solver result against a course list"""
+    is_list, entries = packed
+    schedules = []
+    for score, optimality_gap, positions, alternatives in entries:
+        schedule = Schedule()
+        for (course_idx, section_idx), others in zip(positions, alternatives):
+            section = courses[course_idx].sections[section_idx]
+            schedule.add_section(section)
+            if others:
+                schedule.alternatives[section] = [courses[other_course].sections[other_section]
+                                                  for other_course, other_section in others]
+        schedule.score = score
+        schedule.optimality_gap = optimality_gap
+        schedules.append(schedule)
+    return schedules if is_list else schedules[0]
+
+
+class _BatchContext:
+    """
+    Per-catalog data shared by every request of a batch: the course lookup and
+    section positions. Each request's solver builds a ConflictIndex over that
+    student's own courses; an index over the whole catalog makes every bitset
+    operation catalog-wide and costs more to build than it saves.
+    """
+    def __init__(self, courses, algorithm, solver_options):
+        if algorithm not in SOLVERS:
+            raise ValueError(f"Unknown algorithm {algorithm!r}; expected one of {', '.join(SOLVERS)}")
+        self.courses = courses
+        self.solver = SOLVERS[algorithm]
+        self.solver_options = solver_options
+        self.course_lookup = {course.course_id: course for course in courses}
+        self.section_positions = section_positions(courses)
+
+    def courses_for(self, course_ids):
+        missing = [course_id for course_id in course_ids if course_id not in self.course_lookup]
+        if missing:
+            raise ValueError(f"Courses not in catalog: {', '.join(map(str, missing))}")
+        return [self.course_lookup[course_id] for course_id in course_ids]
+
+    def solve(self, course_ids, preferences):
+        return self.solver(self.courses_for(course_ids), preferences, **self.solver_options)
+
+
+# Per-process batch context of batch_schedule workers
+_batch_context = None
+
+
+def _init_batch_worker(courses, algorithm, solver_options):
+    global _batch_context
+    _batch_context = _BatchContext(courses, algorithm, solver_options)
+
+
+def _solve_batch_request(request_idx, course_ids, preferences):
+    return request_idx, pack_result(_batch_context.solve(course_ids, preferences), _batch_context.section_positions)
+
+
+def batch_schedule(courses, requests, algorithm="backtracking", workers=None, max_pending=None, **solver_options):
+    """
+    Solve many students against one catalog.
+
+    courses is the whole catalog and requests an iterable of
+    (course_ids, StudentPreferences) pairs. The course lookup is built once
+    per catalog (once per worker process when workers > 1) and shared by every
+    request; each solve indexes conflicts among the student's own courses. Yields (request index, result) as each student
+    finishes, so with workers the order follows completion, not input. At most
+    max_pending requests (default 4 per worker) are in flight at a time, so
+    requests can be a long-running generator. Extra keyword arguments go to the
+    solver, e.g. k or time_limit.
+    """
+    if not workers or workers <= 1:
+        context = _BatchContext(courses, algorithm, solver_options)
+        for request_idx, (course_ids, preferences) in enumerate(requests):
+            yield request_idx, context.solve(course_ids, preferences)
+        return
+
+    context = _BatchContext(courses, algorithm, solver_options)
+    max_pending = max_pending or workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(courses, algorithm, solver_options)) as pool:
+        pending = set()
+        for request_idx, (course_ids, preferences) in enumerate(requests):
+            context.courses_for(course_ids)  # Reject unknown courses before they reach a worker
+            pending.add(pool.submit(_solve_batch_request, request_idx, course_ids, preferences))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    request_idx, packed = future.result()
+                    yield request_idx, unpack_result(packed, courses)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                request_idx, packed = future.result()
+                yield request_idx, unpack_result(packed, courses)
+
+
+class SchedulerSession:
+    """
+    Re-solve one student's schedule after small edits without starting over.
+
+    Keeps the conflict index, courses, preferences and optimal schedule of the
+    last solve (found with the backtracking search). solve() compares a request
+    with the previous one and only does the work the changes call for:
+
+    - nothing changed, or only sections the best schedule doesn't use were
+      removed: the previous schedule is still optimal and is returned
+    - sections added: only a schedule using a new section can beat the previous
+      one, so each new section gets one search with its course fixed to it and
+      the previous score as the bound it has to reach
+    - preferences changed, courses removed, or a section of the best schedule
+      removed: the previous schedule, if still complete, is rescored and its
+      score seeds the search as a known reachable bound
+    - courses added: a full search
+
+    The conflict index is updated section by section while the course list
+    stays the same, and rebuilt when it changes. Courses are matched by
+    course_id and sections by identity, so edit a section by replacing it. The
+    score always matches a fresh backtracking_scheduler run; among equally good
+    schedules an added section doesn't displace the previous one.
+
+    Like backtracking_scheduler, the session searches over equivalence_classes
+    unless collapse_equivalent is False, so adding or removing a parallel copy
+    of a section only changes the result's alternatives.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget the previous solve so the next one starts cold"""
+        self.courses = []  # (course_id, sections) of the last solve; courses can be edited in place
+        self.preferences = None  # vars() of the last solve's StudentPreferences
+        self.conflict_index = None
+        self.best_score = float('-inf')
+        self.best_sections = None  # Section of each course in the best schedule, or None if there is none
+        self.last_solve = None  # How the last request was answered: "cold", "warm", "added" or "unchanged"
+
+    def solve(self, courses, preferences, stats=None, progress=None, progress_interval=1000, cancel=None,
+              collapse_equivalent=True):
+        """
+        Return the optimal schedule for courses and preferences.
+
+        progress and cancel work as in backtracking_scheduler, except that a
+        cancelled solve raises SearchCancelled and resets the session.
+        """
+        check_week(courses, preferences.days_per_week)
+        if stats is None:
+            stats = SearchStats()
+        alternatives = None
+        if collapse_equivalent:
+            courses, alternatives = equivalence_classes(courses)
+        courses = list(courses)
+        search_options = {"progress": progress, "progress_interval": progress_interval, "cancel": cancel}
+        try:
+            self._update(courses, preferences, stats, search_options)
+        except SearchCancelled:
+            self.reset()
+            raise
+        self.courses = [(course.course_id, tuple(course.sections)) for course in courses]
+        self.preferences = dict(vars(preferences))
+
+        schedule = Schedule()
+        for section in self.best_sections or ():
+            schedule.add_section(section)
+        schedule.score = self.best_score
+        if alternatives is not None:
+            schedule.alternatives = {section: alternatives[section] for section in schedule.assigned_sections}
+        return schedule
+
+    def _update(self, courses, preferences, stats, search_options):
+        if self.conflict_index is not None and ([course.course_id for course in courses]
+                                                == [course_id for course_id, _ in self.courses]):
+            added = []
+            removed = []
+            for course_idx, ((_, old_sections), course) in enumerate(zip(self.courses, courses)):
+                old_ids = {id(section) for section in old_sections}
+                new_ids = {id(section) for section in course.sections}
+                removed.extend((course_idx, section) for section in old_sections if id(section) not in new_ids)
+                added.extend((course_idx, section) for section in course.sections if id(section) not in old_ids)
+
+            with stats.phase("index"):
+                for course_idx, section in removed:
+                    self.conflict_index.remove_section(section, course_idx)
+                for course_idx, section in added:
+                    self.conflict_index.add_section(section, course_idx)
+
+            best_ids = {id(section) for section in self.best_sections or ()}
+            lost_best = any(id(section) in best_ids for _, section in removed)
+            if not lost_best and (self.best_sections is None or vars(preferences) == self.preferences):
+                # Removing sections can't help and unused ones can't hurt, so only new sections need a look
+                self.last_solve = "added" if added else "unchanged"
+                for course_idx, section in added:
+                    domains = self._domains(courses, stats, fixed=(course_idx, section))
+                    found = self._search(courses, preferences, domains, self.best_score, stats, search_options)
+                    if found is not None and found[0] > self.best_score:
+                        self.best_score, self.best_sections = found
+                return
+        else:
+            with stats.phase("index"):
+                self.conflict_index = ConflictIndex(courses)
+
+        # Full search, seeded with the score of the previous schedule, repaired to fit
+        incumbent = self._repair(courses, preferences, stats)
+        self.last_solve = "warm" if incumbent > float('-inf') else "cold"
+
+        found = self._search(courses, preferences, self._domains(courses, stats), incumbent, stats, search_options)
+        self.best_score, self.best_sections = found if found is not None else (float('-inf'), None)
+
+    def _repair(self, courses, preferences, stats):
+        """
+        Score of the previous best schedule under the new request: its sections
+        that are still offered, plus the best greedy pick for every course that
+        lost its section or is new. Returns -inf if that leaves a conflict.
+        """
+        if self.best_sections is None:
+            return float('-inf')
+        schedule = IncrementalSchedule(preferences, self.conflict_index, stats)
+        previous = {course_id: section for (course_id, _), section in zip(self.courses, self.best_sections)}
+        missing = []
+        for course in courses:
+            section = previous.get(course.course_id)
+            if section is not None and any(section is other for other in course.sections):
+                schedule.push_section(section)
+            else:
+                missing.append(course)
+
+        for course in missing:
+            best_section = None
+            best_score = float('-inf')
+            for section in course.sections:
+                schedule.push_section(section)
+                if not schedule.conflict_count and schedule.score > best_score:
+                    best_section = section
+                    best_score = schedule.score
+                schedule.pop_section()
+            if best_section is None:
+                return float('-inf')
+            schedule.push_section(best_section)
+        return schedule.score
+
+    def _domains(self, courses, stats, fixed=None):
+        """Pruned section masks per course, with one course limited to one section if fixed is given"""
+        return self.conflict_index.pruned_domains(courses, stats, fixed)
+
+    def _search(self, courses, preferences, domains, incumbent, stats, search_options):
+        """Return (score, sections) of the best schedule reaching incumbent, or None"""
+        search = _BacktrackingSearch(courses, preferences, self.conflict_index, stats, domains=domains,
+                                     incumbent=incumbent, **search_options)
+        with stats.phase("search"):
+            search.search()
+        if search.stopped:
+            raise SearchCancelled()
+        ranked = search.ranked()
+        return ranked[0] if ranked else None
+
 
 def main():
     # Create sample courses and sections
@@ -0,0 +1,297 @@
+"""
+Equivalence checks between the solvers.
+
+Every exact solver must agree with a brute-force search over all section
+combinations, and every shortcut (warm re-solves, parallel search, collapsed
+sections, the Pareto front, vectorized scoring) must agree with the plain solver
+it stands in for. Catalogs are small and seeded, so the checks are exhaustive
+and reproducible.
+
+    python -m pytest -q test_scheduler.py
+"""
+import itertools
+import random
+
+import pytest
+
+import scheduler
+
+PATTERNS = [[0, 2], [1, 3], [0, 2, 4], [2, 4], [0, 4], [1], [3], [4], [0, 1, 2, 3, 4]]
+
+
+def random_catalog(seed, num_courses=5, max_sections=4, squeeze=False):
+    """Seeded catalog; squeeze packs every class into 9:00-11:00 so most requests are infeasible"""
+    rng = random.Random(seed)
+    courses = []
+    for course_idx in range(num_courses):
+        course = scheduler.Course(f"C{course_idx}", f"Course {course_idx}")
+        for section_idx in range(rng.randint(1, max_sections)):
+            start = rng.randrange(9 * 60, 11 * 60, 30) if squeeze else rng.randrange(8 * 60, 17 * 60, 30)
+            course.add_section(scheduler.Section(str(section_idx + 1), course.course_id, rng.choice(PATTERNS),
+                                                 start, start + rng.choice([50, 60, 75, 90]), "Prof"))
+        courses.append(course)
+    return courses
+
+
+def random_preferences(seed):
+    rng = random.Random(seed)
+    preferences = scheduler.StudentPreferences()
+    preferences.no_morning_weight = rng.randint(1, 10)
+    preferences.free_days_weight = rng.randint(1, 10)
+    preferences.early_dismissal_weight = rng.randint(1, 10)
+    preferences.consecutive_classes_weight = rng.randint(1, 10)
+    preferences.long_breaks_weight = rng.randint(1, 10)
+    preferences.preferred_break_time = rng.choice([15, 30, 45, 60, 75, 90])
+    preferences.preferred_earliest_time = rng.choice([8, 9, 10, 11]) * 60
+    preferences.preferred_latest_time = rng.choice([14, 15, 16, 17]) * 60
+    return preferences
+
+
+def score_of(sections, preferences):
+    schedule = scheduler.Schedule()
+    for section in sections:
+        schedule.add_section(section)
+    return schedule.calculate_score(preferences)
+
+
+def brute_force_scores(courses, preferences):
+    """Scores of every conflict-free combination, in itertools.product order"""
+    scores = []
+    for combination in itertools.product(*[course.sections for course in courses]):
+        score = score_of(combination, preferences)
+        if score != -1000:
+            scores.append(score)
+    return scores
+
+
+def sections_of(schedule):
+    return [id(section) for section in schedule.assigned_sections]
+
+
+def test_conflict_index_matches_pairwise_overlaps():
+    for seed in range(50):
+        courses = random_catalog(seed, num_courses=6, max_sections=5)
+        index = scheduler.ConflictIndex(courses)
+        for i, sec1 in enumerate(index.sections):
+            for j, sec2 in enumerate(index.sections):
+                expected = i != j and scheduler.sections_overlap(sec1, sec2)
+                assert (index.conflict_masks[i] >> j) & 1 == expected
+
+        # Sections added later are indexed like a fresh build
+        extra = scheduler.Section("X", courses[0].course_id, [0, 2], 540, 600, "Prof")
+        courses[0].add_section(extra)
+        index.add_section(extra, 0)
+        fresh = scheduler.ConflictIndex(courses)
+
+        def conflicting(conflict_index, section):
+            mask = conflict_index.conflict_masks[conflict_index.position(section)]
+            return {id(conflict_index.sections[pos]) for pos in scheduler.bit_positions(mask)}
+
+        for section in fresh.sections:
+            assert conflicting(index, section) == conflicting(fresh, section)
+
+
+@pytest.mark.parametrize("solver", [scheduler.dynamic_programming_scheduler, scheduler.backtracking_scheduler,
+                                    scheduler.clique_scheduler])
+def test_exact_solvers_match_brute_force(solver):
+    for seed in range(60):
+        courses = random_catalog(seed)
+        preferences = random_preferences(seed)
+        scores = brute_force_scores(courses, preferences)
+        schedule = solver(courses, preferences)
+        assert schedule.score == (max(scores) if scores else float('-inf'))
+        if scores:
+            assert score_of(schedule.assigned_sections, preferences) == schedule.score
+
+
+@pytest.mark.parametrize("collapse", [False, True])
+def test_top_k_matches_brute_force(collapse):
+    for seed in range(40):
+        courses = random_catalog(seed)
+        preferences = random_preferences(seed)
+        pool = scheduler.equivalence_classes(courses)[0] if collapse else courses
+        scores = sorted(brute_force_scores(pool, preferences), reverse=True)
+        for solver in (scheduler.backtracking_scheduler, scheduler.dynamic_programming_scheduler):
+            ranked = solver(courses, preferences, k=5, collapse_equivalent=collapse)
+            assert [schedule.score for schedule in ranked] == scores[:5]
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_top_k_rejects_k_below_one(k):
+    courses = random_catalog(0)
+    for solver in (scheduler.backtracking_scheduler, scheduler.dynamic_programming_scheduler):
+        with pytest.raises(ValueError):
+            solver(courses, scheduler.StudentPreferences(), k=k)
+
+
+def test_collapse_keeps_the_optimum_and_lists_alternatives():
+    for seed in range(40):
+        courses = random_catalog(seed)
+        for course in courses:
+            for section in list(course.sections):
+                course.add_section(scheduler.Section(section.section_id + "b", course.course_id, section.days,
+                                                     section.start_time, section.end_time, "Other"))
+        preferences = random_preferences(seed)
+        collapsed = scheduler.backtracking_scheduler(courses, preferences)
+        full = scheduler.backtracking_scheduler(courses, preferences, collapse_equivalent=False)
+        assert collapsed.score == full.score
+        for section in collapsed.assigned_sections:
+            alternatives = collapsed.alternatives[section]
+            assert alternatives[0] is section and len(alternatives) >= 2
+            assert all((other.days, other.start_time, other.end_time)
+                       == (section.days, section.start_time, section.end_time) for other in alternatives)
+
+
+def test_parallel_backtracking_matches_serial():
+    for seed in range(6):
+        courses = random_catalog(seed, num_courses=6, max_sections=5)
+        preferences = random_preferences(seed)
+        serial = scheduler.backtracking_scheduler(courses, preferences, k=3)
+        parallel = scheduler.backtracking_scheduler(courses, preferences, k=3, workers=2, split_depth=1)
+        assert ([(schedule.score, sections_of(schedule)) for schedule in serial]
+                == [(schedule.score, sections_of(schedule)) for schedule in parallel])
+
+
+def test_beam_width_one_is_greedy():
+    for seed in range(60):
+        courses = random_catalog(seed, num_courses=6, max_sections=5)
+        preferences = random_preferences(seed)
+        greedy = scheduler.greedy_schedule_optimizer(courses, preferences)
+        beam = scheduler.beam_search_scheduler(courses, preferences, beam_width=1)
+        assert beam.score == greedy.score
+        assert sorted(sections_of(beam)) == sorted(sections_of(greedy))
+
+
+def test_session_matches_cold_solves_over_edits():
+    rng = random.Random(0)
+    for trial in range(12):
+        catalog = random_catalog(trial, num_courses=5)
+        preferences = random_preferences(trial)
+        session = scheduler.SchedulerSession()
+        collapse = trial % 2 == 0
+        for step in range(10):
+            # Solve a snapshot, as the GUI does, so later edits are seen as edits
+            snapshot = []
+            for course in catalog:
+                copy = scheduler.Course(course.course_id, course.course_name)
+                copy.sections = list(course.sections)
+                snapshot.append(copy)
+            warm = session.solve(snapshot, preferences, collapse_equivalent=collapse)
+            cold = scheduler.backtracking_scheduler(snapshot, preferences)
+            assert warm.score == cold.score, (trial, step, session.last_solve)
+            if warm.score > float('-inf'):
+                assert score_of(warm.assigned_sections, preferences) == warm.score
+
+            edit = rng.choice(["add", "copy", "remove", "remove_best", "preferences", "add_course", "drop_course"])
+            course = rng.choice(catalog)
+            if edit in ("add", "copy"):
+                if edit == "copy":
+                    model = rng.choice(course.sections)
+                else:
+                    model = random_catalog(rng.randrange(1000))[0].sections[0]
+                course.sections.insert(rng.randrange(len(course.sections) + 1),
+                                       scheduler.Section(f"n{step}", course.course_id, model.days,
+                                                         model.start_time, model.end_time, "New"))
+            elif edit == "remove" and len(course.sections) > 1:
+                course.sections.pop(rng.randrange(len(course.sections)))
+            elif edit == "remove_best" and warm.assigned_sections:
+                best = rng.choice(warm.assigned_sections)
+                for course in catalog:
+                    if len(course.sections) > 1:
+                        course.sections = [section for section in course.sections if section is not best]
+            elif edit == "preferences":
+                preferences = random_preferences(rng.randrange(1000))
+            elif edit == "add_course":
+                extra = random_catalog(rng.randrange(1000), num_courses=1)[0]
+                extra.course_id = f"X{step}"
+                for section in extra.sections:
+                    section.course_id = extra.course_id
+                catalog.append(extra)
+            elif edit == "drop_course" and len(catalog) > 2:
+                catalog.remove(course)
+
+
+def test_batch_scoring_matches_calculate_score():
+    np = pytest.importorskip("numpy")
+    import batch_scoring
+
+    for seed in range(40):
+        courses = random_catalog(seed)
+        preferences = random_preferences(seed)
+        arrays, offsets = batch_scoring.SectionArrays.from_courses(courses)
+        combinations = [[offsets[course_idx] + section_idx for course_idx, section_idx in enumerate(choice)]
+                        for choice in itertools.product(*[range(len(course.sections)) for course in courses])]
+        scores = batch_scoring.score_combinations(np.array(combinations), arrays, preferences)
+        for rows, score in zip(combinations, scores):
+            assert score == score_of([arrays.sections[row] for row in rows], preferences)
+
+        assert (batch_scoring.exhaustive_batch_scheduler(courses, preferences, batch_size=7).score
+                == scheduler.backtracking_scheduler(courses, preferences).score)
+
+
+def test_day_criteria_reproduce_score_day():
+    for seed in range(60):
+        courses = random_catalog(seed)
+        preferences = random_preferences(seed)
+        weights = scheduler.criteria_weights(preferences)
+        for combination in itertools.product(*[course.sections for course in courses]):
+            schedule = scheduler.Schedule()
+            for section in combination:
+                schedule.add_section(section)
+            for intervals in schedule._group_by_day(preferences.days_per_week, times=True):
+                intervals = sorted(intervals)
+                criteria = scheduler.day_criteria(intervals, preferences)
+                assert sum(w * c for w, c in zip(weights, criteria)) == scheduler.score_day(intervals, preferences)
+
+
+def test_pareto_front_best_matches_backtracking():
+    for seed in range(30):
+        courses = random_catalog(seed)
+        preferences = random_preferences(seed)
+        front = scheduler.pareto_front(courses, preferences)
+        rng = random.Random(seed)
+        for _ in range(4):
+            for name in ("free_days_weight", "no_morning_weight", "early_dismissal_weight", "long_breaks_weight",
+                         "consecutive_classes_weight"):
+                setattr(preferences, name, rng.randint(0, 10))
+            best = front.best(preferences)
+            assert best.score == scheduler.backtracking_scheduler(courses, preferences).score
+            if best.assigned_sections:
+                assert best.calculate_score(preferences) == best.score
+
+
+def feasible(courses, preferences):
+    return all(course.sections for course in courses) and bool(brute_force_scores(courses, preferences))
+
+
+def test_conflicting_core_is_minimal():
+    preferences = scheduler.StudentPreferences()
+    for seed in range(60):
+        courses = random_catalog(seed, max_sections=3, squeeze=seed % 3 != 0)
+        core = scheduler.conflicting_core(courses)
+        if feasible(courses, preferences):
+            assert core == []
+            continue
+        assert core and not feasible(core, preferences)
+        for course in core:
+            assert feasible([other for other in core if other is not course], preferences)
+
+
+def test_max_coverage_matches_brute_force():
+    for seed in range(60):
+        courses = random_catalog(seed, max_sections=3, squeeze=seed % 3 != 0)
+        preferences = random_preferences(seed)
+        rng = random.Random(seed)
+        priorities = {course.course_id: rng.randint(1, 3) for course in courses} if seed % 2 else None
+        weight = (priorities or {}).get
+
+        best = None
+        for combination in itertools.product(*[course.sections + [None] for course in courses]):
+            sections = [section for section in combination if section is not None]
+            score = score_of(sections, preferences)
+            if score != -1000:
+                key = (sum(weight(section.course_id, 1) for section in sections), score)
+                best = key if best is None else max(best, key)
+
+        schedule = scheduler.max_coverage_scheduler(courses, preferences, priorities=priorities)
+        assert (sum(weight(section.course_id, 1) for section in schedule.assigned_sections), schedule.score) == best